@@ -1,10 +1,34 @@
-import pygame
-import random
 import sys
 import os
+
+# Headless runs (see headless_main) must not open a window or print the pygame
+# banner into the JSON Lines output, so this has to happen before pygame loads.
+if any(arg == "--headless" or arg.startswith("--headless=") for arg in sys.argv):
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import random
 import json
-from collections import deque
-import copy
+import time
+import argparse
+import struct
+import mmap
+import heapq
+import threading
+import queue
+import itertools
+import zlib
+import sqlite3
+from collections import deque, OrderedDict
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Initialization
 pygame.init()
@@ -18,8 +42,11 @@ SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 screen = None
 
-SAVE_FILE = "maze_save.json"
+SAVE_FILE = "maze_save.mzs"
+AUTOSAVE_FILE = "autosave.mzs"
+LEGACY_SAVE_FILE = "maze_save.json"
 LEADERBOARD_FILE = "leaderboard.json"
+LEADERBOARD_DB = "leaderboard.db"
 KEY_BINDINGS_FILE = "key_bindings.json"
 GREEN=(50,225,50)
 RED=(255,0,0)
@@ -98,7 +125,11 @@ DEFAULT_KEYS = {
 }
 
 # Globals for maze
-maze = []
+maze = None
+current_maze_algorithm = None
+current_maze_seed = None
+MAZE_CACHE_DIR = "maze_cache"
+MAZE_CACHE_MAX_FILES = 500
 MAZE_WIDTH = DEFAULT_MAZE_SIZE
 MAZE_HEIGHT = DEFAULT_MAZE_SIZE
 CELL_SIZE = MAZE_PIXEL_SIZE // MAZE_WIDTH
@@ -106,13 +137,16 @@ CELL_SIZE = MAZE_PIXEL_SIZE // MAZE_WIDTH
 # Game State variables
 player_pos = None
 exit_pos = None
-trail = []
+trail = None
 win = False
 steps = 0
 start_time = 0
 hint_path = None
 hint_start_time = None
 HINT_DURATION = 4000  # ms
+MAX_HINT_OVERLAY_PIXELS = 4_000_000
+hint_overlay = None
+hint_overlay_key = None
 show_hint_path = True
 paused = False
 pause_menu_index = 0
@@ -120,7 +154,7 @@ pause_menu_index = 0
 # Current selections and states
 current_theme_name = "Classic"
 current_theme = THEMES[current_theme_name]
-difficulty_sizes = [(15, 15), (21, 21), (31, 31)]
+difficulty_sizes = [(15, 15), (21, 21), (31, 31), (1001, 1001)]
 current_size_index = 1  # Default medium size
 current_maze_backup = None
 current_maze_player_pos = None
@@ -136,88 +170,610 @@ dragging = False
 drag_start = (0, 0)
 pan_start = (0, 0)
 
+# Dirty-rectangle rendering for game_loop, see render_game_frame
+DIRTY_RECT_RENDERING = True
+full_redraw = True
+dirty_cells = []
+drawn_info = None
+
+# Maze layer (cells + grid lines) cached as square chunks, see get_maze_chunk
+CHUNK_CELLS = 64
+MAX_CHUNK_CACHE_PIXELS = 16_000_000
+maze_chunks = OrderedDict()
+maze_chunks_source = None
+maze_chunks_trail = None
+maze_chunks_key = None
+maze_chunks_pixels = 0
+
 # Fonts
 font = pygame.font.SysFont(None, 28)
 font_large = pygame.font.SysFont(None, 44)
 font_menu = pygame.font.SysFont(None, 50, bold=True)
 
-def save_game():
-    global maze, player_pos, exit_pos, trail, steps, start_time
-    try:
-        save_data = {
-            "maze": maze,
-            "maze_width": MAZE_WIDTH,
-            "maze_height": MAZE_HEIGHT,
-            "player_pos": player_pos,
-            "exit_pos": exit_pos,
-            "trail": trail,
-            "steps": steps,
-            "elapsed_time": pygame.time.get_ticks() - start_time,
-            "theme": current_theme_name,
-            "show_hint_path": show_hint_path,
-            "zoom_level": zoom_level,
-            "pan_offset_x": pan_offset_x,
-            "pan_offset_y": pan_offset_y
-        }
-        with open(SAVE_FILE, "w") as f:
-            json.dump(save_data, f)
-        return True
-    except Exception as e:
-        print("Save failed:", e)
-        return False
+# Save files: a versioned binary format (header, bit-packed grid, trail bitmap and
+# the run's replay) read through mmap. Old JSON saves are still loaded as a
+# fallback.
+SAVE_MAGIC = b"MZSV"
+SAVE_VERSION = 2
+SAVE_HEADER = struct.Struct("<4sHIIiiiiIqdddBq")
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+def _pack_text(text):
+    data = (text or "").encode()[:255]
+    return bytes([len(data)]) + data
+
+def _unpack_text(data, pos):
+    length = data[pos]
+    return bytes(data[pos + 1:pos + 1 + length]).decode(), pos + 1 + length
+
+def snapshot_game_state():
+    return {
+        "maze": maze,
+        "maze_algorithm": current_maze_algorithm,
+        "maze_seed": current_maze_seed,
+        "maze_width": MAZE_WIDTH,
+        "maze_height": MAZE_HEIGHT,
+        "player_pos": list(player_pos),
+        "exit_pos": list(exit_pos),
+        "trail": trail.copy(),
+        "replay": current_replay.copy(),
+        "steps": steps,
+        "elapsed_time": pygame.time.get_ticks() - start_time,
+        "theme": current_theme_name,
+        "show_hint_path": show_hint_path,
+        "zoom_level": zoom_level,
+        "pan_offset_x": pan_offset_x,
+        "pan_offset_y": pan_offset_y
+    }
 
-def load_game():
+def encode_save(data):
+    grid = data["maze"]
+    seed = data["maze_seed"]
+    replay_data = data["replay"].encode()
+    return b"".join((
+        SAVE_HEADER.pack(SAVE_MAGIC, SAVE_VERSION, grid.width, grid.height,
+                         *data["player_pos"], *data["exit_pos"], data["steps"], data["elapsed_time"],
+                         data["zoom_level"], data["pan_offset_x"], data["pan_offset_y"],
+                         data["show_hint_path"], -1 if seed is None else seed),
+        _pack_text(data["maze_algorithm"]),
+        _pack_text(data["theme"]),
+        grid.to_packed_bits(),
+        data["trail"].visited,
+        struct.pack("<I", len(replay_data)),
+        replay_data,
+    ))
+
+def decode_save(buffer):
+    (magic, version, width, height, px, py, ex, ey, steps_, elapsed, zoom, pan_x, pan_y,
+     show_hint, seed) = SAVE_HEADER.unpack_from(buffer, 0)
+    if magic != SAVE_MAGIC or version != SAVE_VERSION:
+        raise ValueError(f"unsupported save file (magic {magic!r}, version {version})")
+    pos = SAVE_HEADER.size
+    algorithm, pos = _unpack_text(buffer, pos)
+    theme, pos = _unpack_text(buffer, pos)
+    grid_length = (width * height + 7) // 8
+    grid = MazeGrid.from_packed_bits(width, height, buffer[pos:pos + grid_length])
+    pos += grid_length
+    data = {
+        "maze": grid,
+        "maze_algorithm": algorithm or None,
+        "maze_seed": None if seed < 0 else seed,
+        "maze_width": width,
+        "maze_height": height,
+        "player_pos": [px, py],
+        "exit_pos": [ex, ey],
+        "steps": steps_,
+        "elapsed_time": elapsed,
+        "theme": theme,
+        "show_hint_path": bool(show_hint),
+        "zoom_level": zoom,
+        "pan_offset_x": pan_x,
+        "pan_offset_y": pan_y
+    }
+    data["trail"] = Trail(width, height, bytearray(buffer[pos:pos + grid_length]))
+    pos += grid_length
+    (replay_length,) = struct.unpack_from("<I", buffer, pos)
+    pos += 4
+    data["replay"] = Replay.decode(buffer[pos:pos + replay_length])
+    return data
+
+def upgrade_trail(data):
+    # JSON saves list the trail as positions in walking order; it becomes a
+    # visited bitmap and a replay whose move times (not saved) are all 0.
+    cells = data["trail"] + [data["player_pos"]]
+    data["trail"] = Trail(data["maze_width"], data["maze_height"])
+    data["replay"] = Replay(data["maze_width"], data["maze_height"], data.get("maze_algorithm"),
+                            data.get("maze_seed"), cells[0])
+    for (x0, y0), (x1, y1) in zip(cells, cells[1:]):
+        data["trail"].visit(x0, y0)
+        data["replay"].record(MOVE_DIRECTIONS.index((x1 - x0, y1 - y0)), 0)
+    return data
+
+def read_save_file(path=SAVE_FILE):
+    if path == SAVE_FILE and not os.path.exists(path) and os.path.exists(LEGACY_SAVE_FILE):
+        path = LEGACY_SAVE_FILE
+    with open(path, "rb") as f:
+        if f.read(len(SAVE_MAGIC)) != SAVE_MAGIC:
+            f.seek(0)
+            data = json.load(f)
+            data["maze"] = MazeGrid.from_rows(data["maze"])
+            return upgrade_trail(data)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            data = decode_save(mapped)
+            data["snapshot_crc"] = zlib.crc32(mapped)
+            return data
+
+def apply_save_data(save_data):
     global maze, MAZE_WIDTH, MAZE_HEIGHT, player_pos, exit_pos, trail, steps, start_time
-    global current_theme_name, current_theme
-    global show_hint_path, zoom_level, pan_offset_x, pan_offset_y
+    global current_theme_name, current_theme, current_maze_algorithm, current_maze_seed, current_replay
+    global show_hint_path, zoom_level, pan_offset_x, pan_offset_y, exit_distance, hint_path
+    maze = save_data["maze"]
+    current_maze_algorithm = save_data.get("maze_algorithm")
+    current_maze_seed = save_data.get("maze_seed")
+    MAZE_WIDTH = save_data["maze_width"]
+    MAZE_HEIGHT = save_data["maze_height"]
+    player_pos = save_data["player_pos"]
+    exit_pos = save_data["exit_pos"]
+    trail = save_data["trail"]
+    current_replay = save_data["replay"]
+    steps = save_data["steps"]
+    start_time = pygame.time.get_ticks() - save_data.get("elapsed_time", 0)
+    current_theme_name = save_data.get("theme", "Classic")
+    current_theme = THEMES.get(current_theme_name, THEMES["Classic"])
+    show_hint_path = save_data.get("show_hint_path", True)
+    zoom_level = save_data.get("zoom_level", 1.0)
+    pan_offset_x = save_data.get("pan_offset_x", 0)
+    pan_offset_y = save_data.get("pan_offset_y", 0)
+    exit_distance = save_data.get("exit_distance") or compute_distance_field(maze, exit_pos)
+    # Power-ups are not saved; the maze gets its seeded placement back.
+    place_power_ups(cells=save_data.get("power_up_cells"))
+    hint_path = None
+    release_hint_overlay()
+    compute_cell_size()
+
+def write_file_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+# Autosave journal: every move appends a JOURNAL_RECORD (direction index and game
+# tick) to a small log next to the autosave snapshot. Both live in their own files
+# (AUTOSAVE_FILE), separate from the F5/F9 slot. The journal header carries the
+# CRC of the snapshot it continues, so a stale log is ignored instead of being
+# replayed onto the wrong maze. Every JOURNAL_COMPACT_MOVES moves a fresh snapshot
+# is written and the journal restarts from it. The io worker writes, syncs and
+# renames both files; the main thread only switches to the new journal handle.
+JOURNAL_MAGIC = b"MZJ1"
+JOURNAL_HEADER = struct.Struct("<4sI")
+JOURNAL_RECORD = struct.Struct("<BI")
+JOURNAL_COMPACT_MOVES = 256
+MOVE_DIRECTIONS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+journal_file = None
+journal_records = []
+journal_offset = 0
+journal_session = 0
+journal_checkpoints = 0
+checkpoint_ids = itertools.count(1)
+
+def journal_path(path=AUTOSAVE_FILE):
+    return os.path.splitext(path)[0] + ".mzj"
+
+def write_snapshot(path, data, checkpoint_id=0):
+    snapshot = encode_save(data)
+    write_file_atomic(path, snapshot)
+    journal_tmp = f"{journal_path(path)}.{checkpoint_id}.tmp"
+    with open(journal_tmp, "wb") as f:
+        f.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, zlib.crc32(snapshot)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(journal_tmp, journal_path(path))
+    return open(journal_path(path), "ab", buffering=0)
+
+def replay_journal(data, path=AUTOSAVE_FILE):
+    try:
+        with open(journal_path(path), "rb") as f:
+            log = f.read()
+    except FileNotFoundError:
+        return data
+    if len(log) < JOURNAL_HEADER.size:
+        return data
+    magic, crc = JOURNAL_HEADER.unpack_from(log, 0)
+    if magic != JOURNAL_MAGIC or crc != data.get("snapshot_crc"):
+        return data
+    records = log[JOURNAL_HEADER.size:]
+    records = records[:len(records) - len(records) % JOURNAL_RECORD.size]  # drop a torn last record
+    grid = data["maze"]
+    pos = data["player_pos"]
+    for direction, tick in JOURNAL_RECORD.iter_unpack(records):
+        dx, dy = MOVE_DIRECTIONS[direction]
+        if not grid.is_open(pos[0] + dx, pos[1] + dy):
+            break
+        data["trail"].visit(*pos)
+        data["replay"].record(direction, tick)
+        pos = [pos[0] + dx, pos[1] + dy]
+        data["steps"] += 1
+        data["elapsed_time"] = tick
+    data["player_pos"] = pos
+    return data
+
+def recover_game_state(path=AUTOSAVE_FILE):
+    # The recovered replay must retrace the run exactly, or the win it leads to
+    # would be saved with a replay that fails verification.
+    data = replay_journal(read_save_file(path), path)
+    cells = data["replay"].path(data["maze"])
+    if (cells is None or len(cells) - 1 != data["steps"] or list(cells[-1]) != data["player_pos"]
+            or not all(data["trail"].is_visited(x, y) for x, y in cells[:-1])):
+        raise ValueError("autosave replay does not match the saved run")
+    return data
+
+def finish_checkpoint(new_journal, mark):
+    # Moves made while the checkpoint was being written went to the old journal,
+    # so they are carried over into the new one before switching to it.
+    global journal_file, journal_records, journal_offset
+    journal_records = journal_records[mark - journal_offset:]
+    journal_offset = mark
+    if journal_file:
+        journal_file.close()
+    journal_file = new_journal
+    journal_file.write(b"".join(JOURNAL_RECORD.pack(*record) for record in journal_records))
+
+def begin_journal():
+    global journal_file, journal_records, journal_offset, journal_session
+    if journal_file:
+        journal_file.close()
+        journal_file = None
+    journal_records = []
+    journal_offset = 0
+    journal_session += 1
+    checkpoint_async()
+
+def journal_move(direction, tick):
+    journal_records.append((direction, tick))
+    if journal_file:
+        try:
+            journal_file.write(JOURNAL_RECORD.pack(direction, tick))
+        except OSError as e:
+            print("Journal write failed:", e)
+    if len(journal_records) >= JOURNAL_COMPACT_MOVES and not journal_checkpoints:
+        checkpoint_async()
+
+def load_game(path=SAVE_FILE, recover=False):
+    # recover=True replays the autosave journal onto the snapshot (Continue).
     try:
-        with open(SAVE_FILE, "r") as f:
-            save_data = json.load(f)
-        maze = save_data["maze"]
-        MAZE_WIDTH = save_data["maze_width"]
-        MAZE_HEIGHT = save_data["maze_height"]
-        player_pos = save_data["player_pos"]
-        exit_pos = save_data["exit_pos"]
-        trail = save_data["trail"]
-        steps = save_data["steps"]
-        start_time = pygame.time.get_ticks() - save_data.get("elapsed_time", 0)
-        current_theme_name = save_data.get("theme", "Classic")
-        current_theme = THEMES.get(current_theme_name, THEMES["Classic"])
-        show_hint_path = save_data.get("show_hint_path", True)
-        zoom_level = save_data.get("zoom_level", 1.0)
-        pan_offset_x = save_data.get("pan_offset_x", 0)
-        pan_offset_y = save_data.get("pan_offset_y", 0)
-        compute_cell_size()
+        apply_save_data(recover_game_state(path) if recover else read_save_file(path))
         return True
     except Exception as e:
         print("Load failed:", e)
         return False
 
-def save_leaderboard(time_sec, steps_):
-    leaderboard = []
+# Asynchronous save/load: the game state is snapshotted on the main thread, then
+# encoded and written (or read and decoded) by a background thread. Results are
+# queued and an IO_DONE_EVENT wakes the main loop, which applies them through
+# process_io_results and reports them with a timed toast instead of a delay.
+IO_DONE_EVENT = pygame.USEREVENT + 1
+TOAST_DURATION = 1500  # ms
+io_jobs = queue.Queue()
+io_results = queue.Queue()
+io_thread = None
+toast_message = None
+toast_color = None
+toast_until = 0
+
+def show_toast(message, color, duration=TOAST_DURATION):
+    global toast_message, toast_color, toast_until
+    toast_message, toast_color = message, color
+    toast_until = pygame.time.get_ticks() + duration
+
+def active_toast():
+    if toast_message and pygame.time.get_ticks() < toast_until:
+        return toast_message, toast_color
+    return None
+
+def io_worker():
+    while True:
+        kind, path, payload, meta = io_jobs.get()
+        try:
+            if kind == "checkpoint":
+                result = write_snapshot(path, payload, meta[0])
+            elif kind == "save":
+                result = write_file_atomic(path, encode_save(payload))
+            else:
+                result = read_save_file(path)
+                result["exit_distance"] = compute_distance_field(result["maze"], result["exit_pos"])
+                result["power_up_cells"] = choose_power_up_cells(
+                    result["maze"], rng=random.Random(f"power-ups:{result['maze_seed']}"))
+            io_results.put((kind, path, True, result, meta))
+        except Exception as e:
+            print(f"{kind.capitalize()} failed:", e)
+            io_results.put((kind, path, False, None, meta))
+        try:
+            pygame.event.post(pygame.event.Event(IO_DONE_EVENT, kind=kind))
+        except pygame.error:
+            pass
+
+def submit_io(kind, path, payload=None, meta=None):
+    global io_thread
+    if io_thread is None:
+        io_thread = threading.Thread(target=io_worker, name="save-io", daemon=True)
+        io_thread.start()
+    io_jobs.put((kind, path, payload, meta))
+
+def save_game_async(path=SAVE_FILE):
+    submit_io("save", path, snapshot_game_state())
+
+def checkpoint_async():
+    global journal_checkpoints
+    journal_checkpoints += 1
+    submit_io("checkpoint", AUTOSAVE_FILE, snapshot_game_state(),
+              (next(checkpoint_ids), journal_session, journal_offset + len(journal_records)))
+
+def load_game_async(path=SAVE_FILE):
+    submit_io("load", path)
+
+def process_io_results():
+    global journal_checkpoints
+    loaded = False
+    while True:
+        try:
+            kind, path, ok, data, meta = io_results.get_nowait()
+        except queue.Empty:
+            return loaded
+        if kind == "checkpoint":
+            _, session, mark = meta
+            journal_checkpoints -= 1
+            if ok and session == journal_session:
+                try:
+                    finish_checkpoint(data, mark)
+                except OSError as e:
+                    print("Autosave failed:", e)
+                    ok = False
+            elif ok:
+                data.close()
+            if not ok:
+                show_toast("Autosave failed!", RED)
+        elif kind == "save":
+            show_toast("Game saved successfully!" if ok else "Game save failed!", GREEN if ok else RED)
+        else:
+            if ok:
+                apply_save_data(data)
+                begin_journal()
+                loaded = True
+            show_toast("Game loaded!" if ok else "Load failed!", GREEN if ok else RED)
+
+# Replays: a run is stored as its maze identity (size, algorithm, seed) and start
+# cell, followed by the moves packed four to a byte (2-bit MOVE_DIRECTIONS index)
+# and the move times as varint deltas in ms. The maze itself is regenerated from
+# the seed, so a replay costs a little over 1 byte per move at any maze size.
+REPLAY_MAGIC = b"MZR1"
+REPLAY_HEADER = struct.Struct("<4sIIqiiI")  # magic, width, height, seed, start x/y, move count
+REPLAY_DIR = "replays"
+REPLAY_SPEEDS = (1, 2, 5, 10, 25, 50, 100)
+current_replay = None
+
+class Replay:
+    __slots__ = ("width", "height", "algorithm", "seed", "start", "directions", "ticks")
+
+    def __init__(self, width, height, algorithm, seed, start, directions=None, ticks=None):
+        self.width = width
+        self.height = height
+        self.algorithm = algorithm
+        self.seed = seed
+        self.start = tuple(start)
+        self.directions = bytearray() if directions is None else directions
+        self.ticks = array("I") if ticks is None else ticks
+
+    def __len__(self):
+        return len(self.directions)
+
+    def duration(self):
+        return self.ticks[-1] if self.ticks else 0
+
+    def copy(self):
+        return Replay(self.width, self.height, self.algorithm, self.seed, self.start,
+                      bytearray(self.directions), array("I", self.ticks))
+
+    def record(self, direction, tick):
+        self.directions.append(direction)
+        self.ticks.append(max(tick, self.duration()))
+
+    def path(self, grid):
+        # Cells visited from the start, one per move; None if a move hits a wall.
+        x, y = self.start
+        cells = [(x, y)]
+        for direction in self.directions:
+            dx, dy = MOVE_DIRECTIONS[direction]
+            x += dx
+            y += dy
+            if not grid.is_open(x, y):
+                return None
+            cells.append((x, y))
+        return cells
+
+    def encode(self):
+        packed = bytearray((len(self.directions) + 3) // 4)
+        for i, direction in enumerate(self.directions):
+            packed[i >> 2] |= direction << ((i & 3) << 1)
+        deltas = bytearray()
+        previous = 0
+        for tick in self.ticks:
+            write_varint(deltas, tick - previous)
+            previous = tick
+        return b"".join((
+            REPLAY_HEADER.pack(REPLAY_MAGIC, self.width, self.height, -1 if self.seed is None else self.seed,
+                               *self.start, len(self)),
+            _pack_text(self.algorithm),
+            packed,
+            deltas,
+        ))
+
+    @classmethod
+    def decode(cls, buffer):
+        magic, width, height, seed, start_x, start_y, count = REPLAY_HEADER.unpack_from(buffer, 0)
+        if magic != REPLAY_MAGIC:
+            raise ValueError("not a replay file")
+        if len(buffer) <= REPLAY_HEADER.size:
+            raise ValueError("truncated replay file")
+        algorithm, pos = _unpack_text(buffer, REPLAY_HEADER.size)
+        packed = buffer[pos:pos + (count + 3) // 4]
+        # Every move needs its packed direction and at least one tick byte.
+        if len(packed) < (count + 3) // 4 or len(buffer) - pos - len(packed) < count:
+            raise ValueError("truncated replay file")
+        directions = bytearray((packed[i >> 2] >> ((i & 3) << 1)) & 3 for i in range(count))
+        pos += len(packed)
+        ticks = array("I")
+        tick = 0
+        try:
+            for _ in range(count):
+                delta, pos = read_varint(buffer, pos)
+                tick += delta
+                ticks.append(tick)
+        except IndexError:
+            raise ValueError("truncated replay file") from None
+        return cls(width, height, algorithm or None, None if seed < 0 else seed, (start_x, start_y),
+                   directions, ticks)
+
+    def write(self, path):
+        write_file_atomic(path, self.encode())
+
+    @classmethod
+    def read(cls, path):
+        with open(path, "rb") as f:
+            return cls.decode(f.read())
+
+def begin_replay():
+    global current_replay
+    current_replay = Replay(MAZE_WIDTH, MAZE_HEIGHT, current_maze_algorithm, current_maze_seed, player_pos)
+
+def save_replay(replay):
+    if replay.seed is None:
+        return None
+    path = os.path.join(REPLAY_DIR, f"{replay.width}x{replay.height}_{replay.seed}_{int(time.time() * 1000)}.mzr")
     try:
-        if os.path.exists(LEADERBOARD_FILE):
-            with open(LEADERBOARD_FILE, "r") as f:
-                leaderboard = json.load(f)
-    except:
-        pass
-    leaderboard.append({"time": time_sec, "steps": steps_})
-    leaderboard.sort(key=lambda x: x["time"])
-    leaderboard = leaderboard[:10]
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        replay.write(path)
+        return path
+    except OSError as e:
+        print("Replay save failed:", e)
+        return None
+
+def verify_replay(replay, time_sec=None, steps_=None):
+    # A replay is valid if, on the maze regenerated from its seed, it starts at the
+    # start, never walks through a wall and ends on the exit (with the recorded
+    # step count and time, when given).
+    grid = generate_seeded_maze(replay.algorithm, replay.width, replay.height, replay.seed)
+    start, exit = find_start_exit(grid)
+    if replay.start != tuple(start):
+        return False
+    cells = replay.path(grid)
+    return (cells is not None and cells[-1] == tuple(exit)
+            and (steps_ is None or len(replay) == steps_)
+            and (time_sec is None or replay.duration() // 1000 == time_sec))
+
+# Leaderboard: wins live in a small sqlite database, one row per win, indexed by
+# (width, height, seed, time, steps) so each insert is a B-tree update and each
+# top-N query per difficulty or seed is an index range scan. Each row points at
+# the replay file of its run. Entries from the old leaderboard.json are imported
+# once under the (0, 0) "Imported" partition.
+LEADERBOARD_SIZE = 10
+leaderboard_db = None
+
+def open_leaderboard():
+    global leaderboard_db
+    if leaderboard_db is None:
+        leaderboard_db = sqlite3.connect(LEADERBOARD_DB)
+        leaderboard_db.executescript("""
+            CREATE TABLE IF NOT EXISTS wins (
+                id INTEGER PRIMARY KEY,
+                width INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                seed INTEGER,
+                algorithm TEXT,
+                time_sec INTEGER NOT NULL,
+                steps INTEGER NOT NULL,
+                recorded_at REAL NOT NULL,
+                replay TEXT
+            );
+            CREATE INDEX IF NOT EXISTS wins_by_size ON wins (width, height, time_sec, steps);
+            CREATE INDEX IF NOT EXISTS wins_by_seed ON wins (width, height, seed, time_sec, steps);
+        """)
+        columns = [row[1] for row in leaderboard_db.execute("PRAGMA table_info(wins)")]
+        if "replay" not in columns:
+            leaderboard_db.execute("ALTER TABLE wins ADD COLUMN replay TEXT")
+        migrate_legacy_leaderboard(leaderboard_db)
+    return leaderboard_db
+
+def migrate_legacy_leaderboard(db):
+    if not os.path.exists(LEADERBOARD_FILE):
+        return
     try:
-        with open(LEADERBOARD_FILE, "w") as f:
-            json.dump(leaderboard, f)
+        with open(LEADERBOARD_FILE, "r") as f:
+            entries = json.load(f)
+        with db:
+            db.executemany(
+                "INSERT INTO wins (width, height, time_sec, steps, recorded_at) VALUES (0, 0, ?, ?, ?)",
+                [(entry["time"], entry["steps"], time.time()) for entry in entries])
+        os.replace(LEADERBOARD_FILE, LEADERBOARD_FILE + ".migrated")
+    except Exception as e:
+        print("Leaderboard migration failed:", e)
+
+def save_leaderboard(time_sec, steps_, size=None, seed=None, algorithm=None, replay=None):
+    width, height = size or (MAZE_WIDTH, MAZE_HEIGHT)
+    try:
+        with open_leaderboard() as db:
+            db.execute(
+                "INSERT INTO wins (width, height, seed, algorithm, time_sec, steps, recorded_at, replay) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (width, height, current_maze_seed if seed is None else seed,
+                 algorithm or current_maze_algorithm, time_sec, steps_, time.time(), replay))
     except Exception as e:
         print("Leaderboard save failed:", e)
 
-def load_leaderboard():
+def load_leaderboard(size=None, seed=None, limit=LEADERBOARD_SIZE):
+    width, height = size or (MAZE_WIDTH, MAZE_HEIGHT)
+    query = "SELECT time_sec, steps, seed, replay FROM wins WHERE width = ? AND height = ?"
+    params = [width, height]
+    if seed is not None:
+        query += " AND seed = ?"
+        params.append(seed)
+    query += " ORDER BY time_sec, steps LIMIT ?"
+    params.append(limit)
     try:
-        if os.path.exists(LEADERBOARD_FILE):
-            with open(LEADERBOARD_FILE, "r") as f:
-                return json.load(f)
-    except:
-        pass
-    return []
+        rows = open_leaderboard().execute(query, params).fetchall()
+    except Exception as e:
+        print("Leaderboard load failed:", e)
+        return []
+    return [{"time": t, "steps": s, "seed": sd, "replay": r} for t, s, sd, r in rows]
+
+def leaderboard_replays():
+    rows = open_leaderboard().execute(
+        "SELECT width, height, seed, time_sec, steps, replay FROM wins WHERE replay IS NOT NULL").fetchall()
+    return [{"width": w, "height": h, "seed": sd, "time": t, "steps": s, "replay": r} for w, h, sd, t, s, r in rows]
+
+def leaderboard_partitions():
+    sizes = set(difficulty_sizes)
+    try:
+        sizes.update(open_leaderboard().execute("SELECT DISTINCT width, height FROM wins").fetchall())
+    except Exception as e:
+        print("Leaderboard load failed:", e)
+    return sorted(sizes, key=lambda size: (size == (0, 0), size))
 
 def save_key_bindings(bindings):
     try:
@@ -237,44 +793,483 @@ def load_key_bindings():
 
 key_bindings = load_key_bindings()
 
+BIT_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+BIT_VALUES = bytes.maketrans(b"01", b"\x00\x01")
+
+class MazeGrid:
+    # Row-major grid with one byte per cell (1 = wall, 0 = path).
+    __slots__ = ("width", "height", "cells")
+
+    def __init__(self, width, height, fill=1, cells=None):
+        self.width = width
+        self.height = height
+        self.cells = bytearray([fill]) * (width * height) if cells is None else bytearray(cells)
+
+    def index(self, x, y):
+        return y * self.width + x
+
+    def coords(self, index):
+        y, x = divmod(index, self.width)
+        return x, y
+
+    def get(self, x, y):
+        return self.cells[y * self.width + x]
+
+    def set(self, x, y, value):
+        self.cells[y * self.width + x] = value
+
+    def is_open(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and self.cells[y * self.width + x] == 0
+
+    def copy(self):
+        return MazeGrid(self.width, self.height, cells=self.cells)
+
+    @classmethod
+    def from_rows(cls, rows):
+        return cls(len(rows[0]), len(rows), cells=bytes(v for row in rows for v in row))
+
+    def to_packed_bits(self):
+        # Bit-packed variant: 1 bit per cell, LSB first. Going through a binary
+        # digit string keeps the work inside int() instead of a per-cell loop.
+        digits = self.cells.translate(BIT_DIGITS)[::-1]
+        return int(digits or b"0", 2).to_bytes((len(self.cells) + 7) // 8, "little")
+
+    @classmethod
+    def from_packed_bits(cls, width, height, packed):
+        count = width * height
+        digits = format(int.from_bytes(packed, "little") & ((1 << count) - 1), f"0{count}b")
+        return cls(width, height, cells=digits[::-1].encode().translate(BIT_VALUES))
+
+class Trail:
+    # Cells the player has walked out of, as a bitmap (1 bit per cell, LSB first,
+    # the same layout as MazeGrid.to_packed_bits). Its size depends on the maze,
+    # not on how long the run is, and revisiting a cell costs nothing extra.
+    __slots__ = ("width", "height", "visited")
+
+    def __init__(self, width, height, visited=None):
+        self.width = width
+        self.height = height
+        self.visited = bytearray((width * height + 7) // 8) if visited is None else visited
+
+    def visit(self, x, y):
+        # Returns True the first time a cell is visited.
+        i = y * self.width + x
+        bit = 1 << (i & 7)
+        if self.visited[i >> 3] & bit:
+            return False
+        self.visited[i >> 3] |= bit
+        return True
+
+    def is_visited(self, x, y):
+        i = y * self.width + x
+        return (self.visited[i >> 3] >> (i & 7)) & 1 == 1
+
+    def copy(self):
+        return Trail(self.width, self.height, bytearray(self.visited))
+
+    def cells_in(self, x0, y0, x1, y1):
+        # Visited cells of the box [x0, x1) x [y0, y1), skipping empty rows.
+        visited = self.visited
+        for y in range(y0, y1):
+            i0 = y * self.width + x0
+            if not any(visited[i0 >> 3:(i0 + x1 - x0 + 7) >> 3]):
+                continue
+            for i in range(i0, i0 + x1 - x0):
+                if (visited[i >> 3] >> (i & 7)) & 1:
+                    yield x0 + i - i0, y
+
 def compute_cell_size():
     global CELL_SIZE
     CELL_SIZE = max(5, MAZE_PIXEL_SIZE // MAZE_WIDTH)
 
-def maze_generate_data(width, height):
-    maze_data = [[1 for _ in range(width)] for _ in range(height)]
-    stack = []
-    cx = random.randrange(1, width, 2)
-    cy = random.randrange(1, height, 2)
-    maze_data[cy][cx] = 0
-    stack.append((cx, cy))
-
+# Maze generators
+# Every generator takes (width, height, rng) and returns a MazeGrid where the
+# "rooms" sit on odd coordinates and the walls between them are carved out.
+# They keep their state in preallocated bytearrays/arrays and pick directions by
+# counting instead of building neighbour lists, so nothing is allocated per step.
+# Rooms are addressed on a padded grid (one sentinel room around the border) so
+# neighbour lookups need no bounds checks.
+
+def _padded_rooms(width, height, border):
+    room_w, room_h = (width - 1) // 2, (height - 1) // 2
+    pad_w = room_w + 2
+    state = bytearray([border]) * (pad_w * (room_h + 2))
+    for j in range(1, room_h + 1):
+        state[j*pad_w + 1:j*pad_w + room_w + 1] = bytes(room_w)
+    return room_w, room_h, pad_w, state
+
+def _random_room(room_w, room_h, pad_w, rng):
+    return (rng.randrange(room_h) + 1) * pad_w + rng.randrange(room_w) + 1
+
+def generate_backtracker(width, height, rng=random):
+    grid = MazeGrid(width, height)
+    cells = grid.cells
+    room_w, room_h, pad_w, visited = _padded_rooms(width, height, 1)
+    if not room_w or not room_h:
+        return grid
+    wall_step = {1: 1, -1: -1, pad_w: width, -pad_w: -width}
+    room_steps = (1, -1, pad_w, -pad_w)
+    rand = rng.random
+
+    room = _random_room(room_w, room_h, pad_w, rng)
+    j, i = divmod(room, pad_w)
+    visited[room] = 1
+    cells[(2*j - 1)*width + 2*i - 1] = 0
+    stack = array("i", [room])
     while stack:
-        cx, cy = stack[-1]
-        neighbors = []
-        for dx, dy in [(0,1),(0,-1),(1,0),(-1,0)]:
-            nx, ny = cx + dx*2, cy + dy*2
-            if 0 < nx < width-1 and 0 < ny < height-1:
-                if maze_data[ny][nx] == 1:
-                    neighbors.append((nx, ny))
-        if neighbors:
-            nx, ny = random.choice(neighbors)
-            wall_x, wall_y = cx + (nx - cx)//2, cy + (ny - cy)//2
-            maze_data[wall_y][wall_x] = 0
-            maze_data[ny][nx] = 0
-            stack.append((nx, ny))
-        else:
+        room = stack[-1]
+        count = 4 - visited[room + 1] - visited[room - 1] - visited[room + pad_w] - visited[room - pad_w]
+        if not count:
             stack.pop()
-    return maze_data
+            continue
+        k = int(rand() * count)
+        for step in room_steps:
+            if not visited[room + step]:
+                if not k:
+                    break
+                k -= 1
+        j, i = divmod(room, pad_w)
+        cell = (2*j - 1)*width + 2*i - 1
+        wall = wall_step[step]
+        cells[cell + wall] = 0
+        cells[cell + 2*wall] = 0
+        visited[room + step] = 1
+        stack.append(room + step)
+    return grid
+
+def generate_prim(width, height, rng=random):
+    # state: 0 = untouched, 1 = frontier, 2 = in maze, 3 = border
+    grid = MazeGrid(width, height)
+    cells = grid.cells
+    room_w, room_h, pad_w, state = _padded_rooms(width, height, 3)
+    if not room_w or not room_h:
+        return grid
+    wall_step = {1: 1, -1: -1, pad_w: width, -pad_w: -width}
+    room_steps = (1, -1, pad_w, -pad_w)
+    rand = rng.random
+
+    frontier = array("i")
+    room = _random_room(room_w, room_h, pad_w, rng)
+    while True:
+        state[room] = 2
+        j, i = divmod(room, pad_w)
+        cells[(2*j - 1)*width + 2*i - 1] = 0
+        for step in room_steps:
+            if not state[room + step]:
+                state[room + step] = 1
+                frontier.append(room + step)
+        if not frontier:
+            return grid
+
+        # Swap-remove a random frontier room, then join it to a random maze neighbour.
+        k = int(rand() * len(frontier))
+        room = frontier[k]
+        frontier[k] = frontier[-1]
+        frontier.pop()
+        count = ((state[room + 1] == 2) + (state[room - 1] == 2)
+                 + (state[room + pad_w] == 2) + (state[room - pad_w] == 2))
+        k = int(rand() * count)
+        for step in room_steps:
+            if state[room + step] == 2:
+                if not k:
+                    break
+                k -= 1
+        j, i = divmod(room, pad_w)
+        cells[(2*j - 1)*width + 2*i - 1 + wall_step[step]] = 0
+
+def generate_kruskal(width, height, rng=random):
+    grid = MazeGrid(width, height)
+    cells = grid.cells
+    room_w, room_h = (width - 1) // 2, (height - 1) // 2
+    if not room_w or not room_h:
+        return grid
+    parent = array("i", range(room_w * room_h))
+
+    # Edge e joins room e >> 1 to its right neighbour (even e) or the one below (odd e).
+    edges = array("i", (r << 1 for r in range(room_w * room_h) if (r + 1) % room_w))
+    edges.extend((r << 1) | 1 for r in range(room_w * (room_h - 1)))
+    rng.shuffle(edges)
+
+    for j in range(room_h):
+        row = (2*j + 1) * width
+        for i in range(room_w):
+            cells[row + 2*i + 1] = 0
+
+    remaining = room_w * room_h - 1
+    for edge in edges:
+        a = edge >> 1
+        b = a + room_w if edge & 1 else a + 1
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        while parent[b] != b:
+            parent[b] = parent[parent[b]]
+            b = parent[b]
+        if a == b:
+            continue
+        parent[b] = a
+        j, i = divmod(edge >> 1, room_w)
+        cell = (2*j + 1)*width + 2*i + 1
+        cells[cell + width if edge & 1 else cell + 1] = 0
+        remaining -= 1
+        if not remaining:
+            break
+    return grid
+
+def generate_wilson(width, height, rng=random):
+    # Loop-erased random walks: walk_dir remembers the last step taken out of each
+    # room, so retracing from the walk's start skips any loops automatically.
+    grid = MazeGrid(width, height)
+    cells = grid.cells
+    room_w, room_h, pad_w, in_tree = _padded_rooms(width, height, 2)
+    if not room_w or not room_h:
+        return grid
+    wall_step = {1: 1, -1: -1, pad_w: width, -pad_w: -width}
+    room_steps = (1, -1, pad_w, -pad_w)
+    walk_dir = array("i", bytes(4 * len(in_tree)))
+    randbits = rng.getrandbits
+
+    def carve_room(room):
+        j, i = divmod(room, pad_w)
+        cells[(2*j - 1)*width + 2*i - 1] = 0
+
+    root = _random_room(room_w, room_h, pad_w, rng)
+    in_tree[root] = 1
+    carve_room(root)
+    for j in range(1, room_h + 1):
+        for start in range(j*pad_w + 1, j*pad_w + room_w + 1):
+            if in_tree[start]:
+                continue
+            room = start
+            while not in_tree[room]:
+                step = room_steps[randbits(2)]
+                while in_tree[room + step] == 2:
+                    step = room_steps[randbits(2)]
+                walk_dir[room] = step
+                room += step
+            room = start
+            while not in_tree[room]:
+                in_tree[room] = 1
+                carve_room(room)
+                jj, ii = divmod(room, pad_w)
+                cells[(2*jj - 1)*width + 2*ii - 1 + wall_step[walk_dir[room]]] = 0
+                room += walk_dir[room]
+    return grid
+
+def generate_eller(width, height, rng=random):
+    # Row by row with O(width) state: each column of the current row carries a set
+    # label, and each set keeps a linked list of its columns so merges only relabel
+    # the smaller set.
+    grid = MazeGrid(width, height)
+    cells = grid.cells
+    room_w, room_h = (width - 1) // 2, (height - 1) // 2
+    if not room_w or not room_h:
+        return grid
+    rand = rng.random
+    label = array("i", range(room_w))
+    head = array("i", range(room_w))
+    next_col = array("i", [-1]) * room_w
+    size = array("i", [1]) * room_w
+    remaining = array("i", [0]) * room_w
+    went_down = bytearray(room_w)
+    has_down = bytearray(room_w)
+    used = bytearray(room_w)
+
+    for j in range(room_h):
+        row = (2*j + 1) * width
+        last_row = j == room_h - 1
+        for i in range(room_w):
+            cells[row + 2*i + 1] = 0
+
+        for i in range(room_w - 1):
+            a, b = label[i], label[i + 1]
+            if a == b or not (last_row or rand() < 0.5):
+                continue
+            cells[row + 2*i + 2] = 0
+            if size[a] < size[b]:
+                a, b = b, a
+            col = head[b]
+            while True:
+                label[col] = a
+                if next_col[col] < 0:
+                    break
+                col = next_col[col]
+            next_col[col] = head[a]
+            head[a] = head[b]
+            size[a] += size[b]
+            size[b] = 0
+        if last_row:
+            break
+
+        for s in range(room_w):
+            remaining[s] = size[s]
+            has_down[s] = 0
+            used[s] = 0
+        for i in range(room_w):
+            s = label[i]
+            remaining[s] -= 1
+            if rand() < 0.5 or (not remaining[s] and not has_down[s]):
+                cells[row + width + 2*i + 1] = 0
+                has_down[s] = 1
+                went_down[i] = 1
+                used[s] = 1
+            else:
+                went_down[i] = 0
+
+        # Columns that did not carve down start the next row in fresh singleton sets.
+        free = 0
+        for s in range(room_w):
+            size[s] = 0
+            head[s] = -1
+        for i in range(room_w):
+            if not went_down[i]:
+                while used[free]:
+                    free += 1
+                used[free] = 1
+                label[i] = free
+            s = label[i]
+            next_col[i] = head[s]
+            head[s] = i
+            size[s] += 1
+    return grid
+
+# Vectorized generators (optional NumPy). Binary tree and sidewinder only need
+# independent per-room coin flips, so the whole grid is carved with array ops.
+
+def _numpy_rooms(width, height, rng):
+    room_w, room_h = (width - 1) // 2, (height - 1) // 2
+    grid = np.ones((height, width), dtype=np.uint8)
+    grid[1:2*room_h:2, 1:2*room_w:2] = 0
+    return grid, room_w, room_h, np.random.default_rng(rng.getrandbits(64))
+
+def generate_numpy_binary_tree(width, height, rng=random):
+    grid, room_w, room_h, np_rng = _numpy_rooms(width, height, rng)
+    if not room_w or not room_h:
+        return MazeGrid(width, height)
+    # Each room opens east or north; the top row can only go east and the right
+    # column only north.
+    east = np_rng.random((room_h, room_w)) < 0.5
+    east[0, :] = True
+    east[:, -1] = False
+    north = ~east
+    north[0, :] = False
+    grid[1:2*room_h:2, 2:2*room_w:2][east[:, :-1]] = 0
+    grid[2:2*room_h:2, 1:2*room_w:2][north[1:, :]] = 0
+    return MazeGrid(width, height, cells=grid.tobytes())
+
+def generate_numpy_sidewinder(width, height, rng=random):
+    grid, room_w, room_h, np_rng = _numpy_rooms(width, height, rng)
+    if not room_w or not room_h:
+        return MazeGrid(width, height)
+    grid[1, 2:2*room_w:2] = 0
+    if room_h == 1:
+        return MazeGrid(width, height, cells=grid.tobytes())
+
+    # Below the top row, runs of rooms are joined east until a run is closed, then
+    # one random room of the run opens north. Rows are flattened so runs are plain
+    # ranges between closing rooms.
+    close = np_rng.random((room_h - 1, room_w)) < 0.5
+    close[:, -1] = True
+    grid[3:2*room_h:2, 2:2*room_w:2][~close[:, :-1]] = 0
+
+    close = close.ravel()
+    ends = np.flatnonzero(close)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    chosen = starts + (np_rng.random(len(ends)) * (ends - starts + 1)).astype(np.int64)
+    rows, cols = np.divmod(chosen, room_w)
+    grid[2*rows + 2, 2*cols + 1] = 0
+    return MazeGrid(width, height, cells=grid.tobytes())
+
+MAZE_GENERATORS = {
+    "backtracker": generate_backtracker,
+    "prim": generate_prim,
+    "kruskal": generate_kruskal,
+    "wilson": generate_wilson,
+    "eller": generate_eller,
+}
+NUMPY_MAZE_GENERATORS = {
+    "numpy_binary_tree": generate_numpy_binary_tree,
+    "numpy_sidewinder": generate_numpy_sidewinder,
+}
+if np is not None:
+    MAZE_GENERATORS.update(NUMPY_MAZE_GENERATORS)
+# The game always uses the default; the vectorized generators are opt-in
+# (headless --algorithm and the batch API) because their mazes are far easier.
+DEFAULT_MAZE_ALGORITHM = "backtracker"
+
+def resolve_maze_algorithm(algorithm):
+    # Without NumPy the vectorized generators fall back to the default; callers
+    # record the resolved name so replays and results name the maze actually built.
+    if algorithm not in MAZE_GENERATORS and algorithm in NUMPY_MAZE_GENERATORS:
+        return DEFAULT_MAZE_ALGORITHM
+    return algorithm
+
+def maze_generate_data(width, height, algorithm=DEFAULT_MAZE_ALGORITHM, rng=random):
+    return MAZE_GENERATORS[resolve_maze_algorithm(algorithm)](width, height, rng)
+
+# Seeded mazes: a maze is identified by (algorithm, width, height, seed) and is
+# generated from its own random.Random(seed), so it can be reproduced anywhere.
+# Generated grids are kept bit-packed in MAZE_CACHE_DIR.
+
+def new_maze_seed():
+    return random.getrandbits(32)
+
+def maze_cache_path(algorithm, width, height, seed):
+    return os.path.join(MAZE_CACHE_DIR, f"{algorithm}-{width}x{height}-{seed}.maze")
+
+def generate_seeded_maze(algorithm, width, height, seed, use_cache=True):
+    algorithm = resolve_maze_algorithm(algorithm)
+    if not use_cache:
+        return maze_generate_data(width, height, algorithm, random.Random(seed))
+    path = maze_cache_path(algorithm, width, height, seed)
+    try:
+        with open(path, "rb") as f:
+            packed = f.read()
+        if len(packed) == (width * height + 7) // 8:
+            return MazeGrid.from_packed_bits(width, height, packed)
+    except OSError:
+        pass
+
+    grid = maze_generate_data(width, height, algorithm, random.Random(seed))
+    try:
+        os.makedirs(MAZE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(grid.to_packed_bits())
+        os.replace(tmp_path, path)
+        prune_maze_cache()
+    except OSError as e:
+        print("Maze cache write failed:", e)
+    return grid
+
+def prune_maze_cache():
+    entries = [e for e in os.scandir(MAZE_CACHE_DIR) if e.name.endswith(".maze")]
+    if len(entries) <= MAZE_CACHE_MAX_FILES:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for entry in entries[:len(entries) - MAZE_CACHE_MAX_FILES]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+def benchmark_generators(sizes=(101, 1001, 4001), algorithms=None):
+    for size in sizes:
+        for name in algorithms or MAZE_GENERATORS:
+            began = time.perf_counter()
+            maze_generate_data(size, size, name, random.Random(size))
+            elapsed = time.perf_counter() - began
+            yield {"benchmark": "generator", "algorithm": name, "size": size, "seconds": round(elapsed, 4),
+                   "cells_per_second": int(size * size / elapsed) if elapsed else None}
 
 def maze_generator_visual(offset_x, offset_y):
     global maze
-    maze = [[1 for _ in range(MAZE_WIDTH)] for _ in range(MAZE_HEIGHT)]
+    maze = MazeGrid(MAZE_WIDTH, MAZE_HEIGHT)
     stack = []
 
     cx = random.randrange(1, MAZE_WIDTH, 2)
     cy = random.randrange(1, MAZE_HEIGHT, 2)
-    maze[cy][cx] = 0
+    maze.set(cx, cy, 0)
     stack.append((cx, cy))
 
     while stack:
@@ -306,51 +1301,172 @@ def maze_generator_visual(offset_x, offset_y):
         for dx, dy in [(0,1),(0,-1),(1,0),(-1,0)]:
             nx, ny = cx + dx*2, cy + dy*2
             if 0 < nx < MAZE_WIDTH-1 and 0 < ny < MAZE_HEIGHT-1:
-                if maze[ny][nx] == 1:
+                if maze.get(nx, ny) == 1:
                     neighbors.append((nx, ny))
 
         if neighbors:
             nx, ny = random.choice(neighbors)
             wall_x, wall_y = cx + (nx - cx)//2, cy + (ny - cy)//2
-            maze[wall_y][wall_x] = 0
-            maze[ny][nx] = 0
+            maze.set(wall_x, wall_y, 0)
+            maze.set(nx, ny, 0)
+            invalidate_maze_layer()
             stack.append((nx, ny))
         else:
             stack.pop()
 
+def invalidate_maze_layer():
+    maze_chunks.clear()
+
+def build_maze_chunk(chunk_x, chunk_y):
+    cell = CELL_SIZE * zoom_level
+    x_start, y_start = chunk_x * CHUNK_CELLS, chunk_y * CHUNK_CELLS
+    x_end = min(MAZE_WIDTH, x_start + CHUNK_CELLS)
+    y_end = min(MAZE_HEIGHT, y_start + CHUNK_CELLS)
+    left, top = int(x_start * cell), int(y_start * cell)
+    right, bottom = int(x_end * cell), int(y_end * cell)
+    chunk = pygame.Surface((right - left + 1, bottom - top + 1))
+    chunk.fill(current_theme["path"])
+
+    # Walls are drawn as one rect per horizontal run instead of one per cell.
+    wall_color = current_theme["wall"]
+    cells = maze.cells
+    for y in range(y_start, y_end):
+        row_start = maze.index(0, y)
+        row_top = int(y * cell) - top
+        row_height = int((y + 1) * cell) - int(y * cell)
+        i, row_end = row_start + x_start, row_start + x_end
+        while True:
+            i = cells.find(1, i, row_end)
+            if i < 0:
+                break
+            run_end = cells.find(0, i, row_end)
+            if run_end < 0:
+                run_end = row_end
+            run_left = int((i - row_start) * cell)
+            pygame.draw.rect(chunk, wall_color, (run_left - left, row_top,
+                                                 int((run_end - row_start) * cell) - run_left, row_height))
+            i = run_end
+
+    line_color = current_theme["line"]
+    for y in range(y_start, y_end + 1):
+        pygame.draw.line(chunk, line_color, (0, int(y * cell) - top), (right - left, int(y * cell) - top))
+    for x in range(x_start, x_end + 1):
+        pygame.draw.line(chunk, line_color, (int(x * cell) - left, 0), (int(x * cell) - left, bottom - top))
+
+    if trail is not None:
+        for x, y in trail.cells_in(x_start, y_start, x_end, y_end):
+            draw_trail_mark(chunk, x, y, left, top)
+    return chunk
+
+def draw_trail_mark(surface, x, y, left, top):
+    cell = CELL_SIZE * zoom_level
+    pygame.draw.rect(surface, current_theme["trail"],
+                     (int(x * cell + cell / 4) - left, int(y * cell + cell / 4) - top, int(cell / 2), int(cell / 2)))
+
+def visit_trail_cell(x, y):
+    # The trail is baked into the maze chunks: a newly visited cell is stamped
+    # into its cached chunk (chunks built later read it from the bitmap), so the
+    # trail costs nothing per frame however long the run gets.
+    if not trail.visit(x, y):
+        return
+    chunk_x, chunk_y = x // CHUNK_CELLS, y // CHUNK_CELLS
+    chunk = maze_chunks.get((chunk_x, chunk_y))
+    if chunk is not None:
+        cell = CELL_SIZE * zoom_level
+        draw_trail_mark(chunk, x, y, int(chunk_x * CHUNK_CELLS * cell), int(chunk_y * CHUNK_CELLS * cell))
+
+def get_maze_chunk(chunk_x, chunk_y):
+    # Chunks only depend on the maze, the trail, the theme and the zoom, so the
+    # whole cache is dropped when one of them changes. Otherwise the least recently
+    # used chunks are evicted once the cache grows past MAX_CHUNK_CACHE_PIXELS.
+    global maze_chunks_source, maze_chunks_trail, maze_chunks_key, maze_chunks_pixels
+    key = (current_theme_name, zoom_level, CELL_SIZE, MAZE_WIDTH, MAZE_HEIGHT)
+    if maze_chunks_source is not maze or maze_chunks_trail is not trail or maze_chunks_key != key:
+        maze_chunks.clear()
+        maze_chunks_source = maze
+        maze_chunks_trail = trail
+        maze_chunks_key = key
+    if not maze_chunks:
+        maze_chunks_pixels = 0
+
+    chunk = maze_chunks.get((chunk_x, chunk_y))
+    if chunk is not None:
+        maze_chunks.move_to_end((chunk_x, chunk_y))
+        return chunk
+    chunk = build_maze_chunk(chunk_x, chunk_y)
+    maze_chunks[(chunk_x, chunk_y)] = chunk
+    maze_chunks_pixels += chunk.get_width() * chunk.get_height()
+    while maze_chunks_pixels > MAX_CHUNK_CACHE_PIXELS and len(maze_chunks) > 1:
+        _, old = maze_chunks.popitem(last=False)
+        maze_chunks_pixels -= old.get_width() * old.get_height()
+    return chunk
+
+def visible_cell_range(offset_x=0, offset_y=0):
+    # Camera: the cells covered by the current clip area (the whole screen unless a
+    # dirty-rect frame is being drawn) for the given pan offset and zoom.
+    # Returns (x0, y0, x1, y1) with exclusive upper bounds, clamped to the maze.
+    size = CELL_SIZE * zoom_level
+    view = screen.get_clip()
+    x0 = max(0, int((view.left - offset_x) // size))
+    y0 = max(0, int((view.top - offset_y) // size))
+    x1 = min(MAZE_WIDTH, int((view.right - offset_x) // size) + 1)
+    y1 = min(MAZE_HEIGHT, int((view.bottom - offset_y) // size) + 1)
+    return x0, y0, max(x0, x1), max(y0, y1)
+
 def draw_maze(hint_path=None, offset_x=0, offset_y=0):
-    for y in range(MAZE_HEIGHT):
-        for x in range(MAZE_WIDTH):
-            rect = pygame.Rect(offset_x + x*CELL_SIZE*zoom_level,
-                               offset_y + y*CELL_SIZE*zoom_level,
-                               CELL_SIZE*zoom_level, CELL_SIZE*zoom_level)
-            if maze[y][x] == 1:
-                pygame.draw.rect(screen, current_theme["wall"], rect)
-            else:
-                pygame.draw.rect(screen, current_theme["path"], rect)
+    cell = CELL_SIZE * zoom_level
+    x0, y0, x1, y1 = visible_cell_range(offset_x, offset_y)
+    if x0 < x1 and y0 < y1:
+        for chunk_y in range(y0 // CHUNK_CELLS, (y1 - 1) // CHUNK_CELLS + 1):
+            for chunk_x in range(x0 // CHUNK_CELLS, (x1 - 1) // CHUNK_CELLS + 1):
+                chunk = get_maze_chunk(chunk_x, chunk_y)
+                screen.blit(chunk, (int(offset_x) + int(chunk_x * CHUNK_CELLS * cell),
+                                    int(offset_y) + int(chunk_y * CHUNK_CELLS * cell)))
 
     if hint_path and show_hint_path:
-        for cx, cy in hint_path:
-            hint_rect = pygame.Rect(offset_x + cx*CELL_SIZE*zoom_level + CELL_SIZE*zoom_level/4,
-                                    offset_y + cy*CELL_SIZE*zoom_level + CELL_SIZE*zoom_level/4,
-                                    CELL_SIZE*zoom_level/2, CELL_SIZE*zoom_level/2)
-            s = pygame.Surface((hint_rect.width, hint_rect.height), pygame.SRCALPHA)
-            s.fill(current_theme["hint"])
-            screen.blit(s, (hint_rect.x, hint_rect.y))
-
-    for y in range(MAZE_HEIGHT + 1):
-        pygame.draw.line(screen, current_theme["line"], (offset_x, offset_y + y*CELL_SIZE*zoom_level),
-                         (offset_x + CELL_SIZE*MAZE_WIDTH*zoom_level, offset_y + y*CELL_SIZE*zoom_level))
-    for x in range(MAZE_WIDTH + 1):
-        pygame.draw.line(screen, current_theme["line"], (offset_x + x*CELL_SIZE*zoom_level, offset_y),
-                         (offset_x + x*CELL_SIZE*zoom_level, offset_y + CELL_SIZE*MAZE_HEIGHT*zoom_level))
-
-def draw_player(pos, trail, offset_x=0, offset_y=0):
-    for tpos in trail:
-        rect = pygame.Rect(offset_x + tpos[0]*CELL_SIZE*zoom_level + CELL_SIZE*zoom_level/4,
-                           offset_y + tpos[1]*CELL_SIZE*zoom_level + CELL_SIZE*zoom_level/4,
-                           CELL_SIZE*zoom_level/2, CELL_SIZE*zoom_level/2)
-        pygame.draw.rect(screen, current_theme["trail"], rect)
+        overlay, left, top = get_hint_overlay(hint_path)
+        if left is not None:
+            screen.blit(overlay, (int(offset_x) + left, int(offset_y) + top))
+        else:
+            for cx, cy in hint_path:
+                if x0 <= cx < x1 and y0 <= cy < y1:
+                    screen.blit(overlay, (int(offset_x) + int(cx * cell + cell / 4),
+                                          int(offset_y) + int(cy * cell + cell / 4)))
+
+def get_hint_overlay(path):
+    # The hint is drawn once into a translucent surface covering the path's
+    # bounding box and reused until the path, zoom or theme changes. Returns
+    # (surface, left, top) in maze pixels. Paths whose box would exceed
+    # MAX_HINT_OVERLAY_PIXELS (long hints on huge mazes) instead get a single
+    # reused marker surface, returned with left/top None, to stamp once per cell.
+    global hint_overlay, hint_overlay_key
+    cell = CELL_SIZE * zoom_level
+    key = (path, zoom_level, CELL_SIZE, current_theme_name)
+    if hint_overlay is not None and hint_overlay_key[0] is path and hint_overlay_key[1:] == key[1:]:
+        return hint_overlay
+    size = int(cell / 2)
+    left = int(min(cx for cx, _ in path) * cell)
+    top = int(min(cy for _, cy in path) * cell)
+    right = int((max(cx for cx, _ in path) + 1) * cell)
+    bottom = int((max(cy for _, cy in path) + 1) * cell)
+    if (right - left) * (bottom - top) > MAX_HINT_OVERLAY_PIXELS:
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        surface.fill(current_theme["hint"])
+        hint_overlay = (surface, None, None)
+    else:
+        surface = pygame.Surface((right - left, bottom - top), pygame.SRCALPHA)
+        color = current_theme["hint"]
+        for cx, cy in path:
+            surface.fill(color, (int(cx * cell + cell / 4) - left, int(cy * cell + cell / 4) - top, size, size))
+        hint_overlay = (surface, left, top)
+    hint_overlay_key = key
+    return hint_overlay
+
+def release_hint_overlay():
+    global hint_overlay, hint_overlay_key
+    hint_overlay = hint_overlay_key = None
+
+def draw_player(pos, offset_x=0, offset_y=0):
     rect = pygame.Rect(offset_x + pos[0]*CELL_SIZE*zoom_level + CELL_SIZE*zoom_level/6,
                        offset_y + pos[1]*CELL_SIZE*zoom_level + CELL_SIZE*zoom_level/6,
                        CELL_SIZE*zoom_level*2/3, CELL_SIZE*zoom_level*2/3)
@@ -363,6 +1479,24 @@ def draw_exit(pos, highlight=False, offset_x=0, offset_y=0):
     color = current_theme["highlight"] if highlight else current_theme["exit"]
     pygame.draw.rect(screen, color, rect)
 
+# Rendered text surfaces, keyed by (font, string, color) and evicted least
+# recently used first. Menu labels and the static info bar lines are rendered
+# once; lines with a changing value (time, steps) only when the value changes.
+TEXT_CACHE_SIZE = 256
+text_cache = OrderedDict()
+
+def render_text(font_, text, color):
+    key = (font_, text, tuple(color))
+    surface = text_cache.get(key)
+    if surface is not None:
+        text_cache.move_to_end(key)
+        return surface
+    surface = font_.render(text, True, color)
+    text_cache[key] = surface
+    if len(text_cache) > TEXT_CACHE_SIZE:
+        text_cache.popitem(last=False)
+    return surface
+
 def draw_info_bar(messages, color=None):
     bar_rect = pygame.Rect(0, SCREEN_HEIGHT - INFO_BAR_HEIGHT, SCREEN_WIDTH, INFO_BAR_HEIGHT)
     pygame.draw.rect(screen, current_theme["info_bar"], bar_rect)
@@ -370,94 +1504,759 @@ def draw_info_bar(messages, color=None):
     line_height = 24
     col = color if color else current_theme["text"]
     for i, message in enumerate(messages):
-        text = font.render(message, True, col)
+        text = render_text(font, message, col)
         text_rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - INFO_BAR_HEIGHT + padding_top + i*line_height))
         screen.blit(text, text_rect)
 
-def find_start_exit():
-    start, exit = None, None
-    for y in range(MAZE_HEIGHT):
-        for x in range(MAZE_WIDTH):
-            if maze[y][x] == 0:
-                start = [x, y]
-                break
-        if start: break
-    for y in range(MAZE_HEIGHT-1, -1, -1):
-        for x in range(MAZE_WIDTH-1, -1, -1):
-            if maze[y][x] == 0:
-                exit = [x, y]
-                break
-        if exit: break
+def find_start_exit(grid=None):
+    if grid is None:
+        grid = maze
+    first = grid.cells.find(0)
+    if first < 0:
+        return None, None
+    start = list(grid.coords(first))
+    exit = list(grid.coords(grid.cells.rfind(0)))
     return start, exit
 
 def can_move(pos, direction):
     x, y = pos
     dx, dy = direction
-    nx, ny = x + dx, y + dy
-    if 0 <= nx < MAZE_WIDTH and 0 <= ny < MAZE_HEIGHT and maze[ny][nx] == 0:
-        return True
-    return False
-
-def bfs_shortest_path(start, goal):
-    queue = deque([start])
-    visited = {tuple(start): None}
+    return maze.is_open(x + dx, y + dy)
+
+# Distance-to-exit field: one reverse BFS from the exit when a maze is created,
+# after which a hint is just a walk down the gradient from the player.
+UNREACHABLE = 0xFFFFFFFF
+exit_distance = None
+hint_solver = "distance_field"
+
+def compute_distance_field(grid, goal):
+    width, cells = grid.width, grid.cells
+    size = len(cells)
+    dist = array("I", [UNREACHABLE]) * size
+    goal_i = grid.index(*goal)
+    dist[goal_i] = 0
+    frontier = [goal_i]
+    d = 0
+    while frontier:
+        d += 1
+        next_frontier = []
+        for current in frontier:
+            x = current % width
+            for neighbor, ok in ((current + width, True), (current - width, True),
+                                 (current + 1, x < width - 1), (current - 1, x > 0)):
+                if (ok and 0 <= neighbor < size and cells[neighbor] == 0
+                        and dist[neighbor] == UNREACHABLE):
+                    dist[neighbor] = d
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return dist
+
+def hint_path_from_field(start, dist=None):
+    dist = exit_distance if dist is None else dist
+    width = MAZE_WIDTH
+    current = maze.index(*start)
+    d = dist[current]
+    if d == UNREACHABLE:
+        return None
+    path = []
+    while d:
+        x = current % width
+        for neighbor, ok in ((current + width, True), (current - width, True),
+                             (current + 1, x < width - 1), (current - 1, x > 0)):
+            if ok and 0 <= neighbor < len(dist) and dist[neighbor] == d - 1:
+                break
+        current = neighbor
+        d -= 1
+        path.append(maze.coords(current))
+    return path
+
+def find_hint_path(start, solver=None):
+    # "distance_field" walks the precomputed field; any other name runs that solver.
+    solver = solver or hint_solver
+    if solver == "distance_field" and exit_distance is not None and len(exit_distance) == len(maze.cells):
+        return hint_path_from_field(start)
+    return SOLVERS.get(solver, solve_bfs)(maze, tuple(start), tuple(exit_pos))
+
+# Pathfinding solvers
+# Every solver takes (grid, start, goal, stats=None) with (x, y) cells and returns
+# the path from start (excluded) to goal (included), or None. If a stats dict is
+# given, "expanded" is set to the number of nodes taken off the open list.
+
+def _open_neighbors(cells, width, index):
+    x = index % width
+    size = len(cells)
+    return [n for n, ok in ((index + width, True), (index - width, True),
+                            (index + 1, x < width - 1), (index - 1, x > 0))
+            if ok and 0 <= n < size and cells[n] == 0]
+
+def _trace_path(grid, parent, start_i, goal_i):
+    path = []
+    current = goal_i
+    while current != start_i:
+        path.append(grid.coords(current))
+        current = parent[current]
+    path.reverse()
+    return path
+
+def solve_bfs(grid, start, goal, stats=None):
+    width, cells = grid.width, grid.cells
+    start_i = grid.index(*start)
+    goal_i = grid.index(*goal)
+    parent = array("i", [-1]) * len(cells)
+    parent[start_i] = start_i
+    queue = deque([start_i])
+    expanded = 0
+    path = None
     while queue:
         current = queue.popleft()
-        if current == goal:
-            path = []
-            while current != start:
-                path.append(current)
-                current = visited[current]
-            path.reverse()
-            return path
-        for dx, dy in [(0,1),(0,-1),(1,0),(-1,0)]:
-            neighbor = (current[0]+dx, current[1]+dy)
-            if (0 <= neighbor[0] < MAZE_WIDTH and 0 <= neighbor[1] < MAZE_HEIGHT
-                and maze[neighbor[1]][neighbor[0]] == 0 and neighbor not in visited):
-                visited[neighbor] = current
+        expanded += 1
+        if current == goal_i:
+            path = _trace_path(grid, parent, start_i, goal_i)
+            break
+        x = current % width
+        for neighbor, ok in ((current + width, True), (current - width, True),
+                             (current + 1, x < width - 1), (current - 1, x > 0)):
+            if (ok and 0 <= neighbor < len(cells) and cells[neighbor] == 0
+                    and parent[neighbor] < 0):
+                parent[neighbor] = current
                 queue.append(neighbor)
+    if stats is not None:
+        stats["expanded"] = expanded
+    return path
+
+def bfs_shortest_path(start, goal):
+    return solve_bfs(maze, start, goal)
+
+def solve_astar(grid, start, goal, stats=None):
+    width, cells = grid.width, grid.cells
+    start_i = grid.index(*start)
+    goal_i = grid.index(*goal)
+    gx, gy = goal
+    cost = array("I", [UNREACHABLE]) * len(cells)
+    parent = array("i", [-1]) * len(cells)
+    cost[start_i] = 0
+    parent[start_i] = start_i
+    # Ties on f are broken towards the smaller heuristic, i.e. deeper nodes.
+    h = abs(start[0] - gx) + abs(start[1] - gy)
+    open_heap = [(h, h, start_i)]
+    expanded = 0
+    path = None
+    while open_heap:
+        f, h, current = heapq.heappop(open_heap)
+        g = f - h
+        if g > cost[current]:
+            continue
+        expanded += 1
+        if current == goal_i:
+            path = _trace_path(grid, parent, start_i, goal_i)
+            break
+        for neighbor in _open_neighbors(cells, width, current):
+            if g + 1 < cost[neighbor]:
+                cost[neighbor] = g + 1
+                parent[neighbor] = current
+                y, x = divmod(neighbor, width)
+                h = abs(x - gx) + abs(y - gy)
+                heapq.heappush(open_heap, (g + 1 + h, h, neighbor))
+    if stats is not None:
+        stats["expanded"] = expanded
+    return path
+
+def solve_bidirectional_bfs(grid, start, goal, stats=None):
+    # Level-synchronous BFS from both ends, always growing the smaller frontier.
+    width, cells = grid.width, grid.cells
+    start_i = grid.index(*start)
+    goal_i = grid.index(*goal)
+    if start_i == goal_i:
+        return []
+    forward = array("i", [-1]) * len(cells)
+    backward = array("i", [-1]) * len(cells)
+    forward[start_i] = start_i
+    backward[goal_i] = goal_i
+    forward_frontier, backward_frontier = [start_i], [goal_i]
+    expanded = 0
+    meet = -1
+    while forward_frontier and backward_frontier and meet < 0:
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, seen, other = forward_frontier, forward, backward
+        else:
+            frontier, seen, other = backward_frontier, backward, forward
+        next_frontier = []
+        for current in frontier:
+            expanded += 1
+            for neighbor in _open_neighbors(cells, width, current):
+                if seen[neighbor] < 0:
+                    seen[neighbor] = current
+                    if other[neighbor] >= 0:
+                        meet = neighbor
+                        break
+                    next_frontier.append(neighbor)
+            if meet >= 0:
+                break
+        if frontier is forward_frontier:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+    if stats is not None:
+        stats["expanded"] = expanded
+    if meet < 0:
+        return None
+    path = _trace_path(grid, forward, start_i, meet)
+    current = meet
+    while current != goal_i:
+        current = backward[current]
+        path.append(grid.coords(current))
+    return path
+
+def solve_jps(grid, start, goal, stats=None):
+    # Jump point search for 4-connected moves. Horizontal jumps stop at forced
+    # neighbours; vertical jumps also stop wherever a horizontal jump would find a
+    # jump point. Successors are then pruned to the forward and sideways directions.
+    width, height, cells = grid.width, grid.height, grid.cells
+    goal = tuple(goal)
+    gx, gy = goal
+
+    def walkable(x, y):
+        return 0 <= x < width and 0 <= y < height and cells[y*width + x] == 0
+
+    def jump_horizontal(x, y, dx):
+        while True:
+            x += dx
+            if not walkable(x, y):
+                return None
+            if (x, y) == goal:
+                return x, y
+            if ((walkable(x, y - 1) and not walkable(x - dx, y - 1))
+                    or (walkable(x, y + 1) and not walkable(x - dx, y + 1))):
+                return x, y
+
+    def jump_vertical(x, y, dy):
+        while True:
+            y += dy
+            if not walkable(x, y):
+                return None
+            if (x, y) == goal:
+                return x, y
+            if ((walkable(x - 1, y) and not walkable(x - 1, y - dy))
+                    or (walkable(x + 1, y) and not walkable(x + 1, y - dy))):
+                return x, y
+            if jump_horizontal(x, y, 1) or jump_horizontal(x, y, -1):
+                return x, y
+
+    start = tuple(start)
+    parent = {start: None}
+    cost = {start: 0}
+    h = abs(start[0] - gx) + abs(start[1] - gy)
+    open_heap = [(h, h, start)]
+    expanded = 0
+    found = False
+    while open_heap:
+        f, h, node = heapq.heappop(open_heap)
+        g = f - h
+        if g > cost[node]:
+            continue
+        expanded += 1
+        if node == goal:
+            found = True
+            break
+        x, y = node
+        previous = parent[node]
+        if previous is None:
+            directions = ((1, 0), (-1, 0), (0, 1), (0, -1))
+        elif previous[1] == y:
+            dx = 1 if x > previous[0] else -1
+            directions = ((dx, 0), (0, 1), (0, -1))
+        else:
+            dy = 1 if y > previous[1] else -1
+            directions = ((0, dy), (1, 0), (-1, 0))
+        for dx, dy in directions:
+            point = jump_horizontal(x, y, dx) if dx else jump_vertical(x, y, dy)
+            if point is None:
+                continue
+            new_cost = g + abs(point[0] - x) + abs(point[1] - y)
+            if new_cost < cost.get(point, UNREACHABLE):
+                cost[point] = new_cost
+                parent[point] = node
+                h = abs(point[0] - gx) + abs(point[1] - gy)
+                heapq.heappush(open_heap, (new_cost + h, h, point))
+    if stats is not None:
+        stats["expanded"] = expanded
+    if not found:
+        return None
+
+    # Expand the straight segments between consecutive jump points.
+    path = []
+    node = goal
+    while parent[node] is not None:
+        px, py = parent[node]
+        x, y = node
+        step_x = (x > px) - (x < px)
+        step_y = (y > py) - (y < py)
+        while (x, y) != (px, py):
+            path.append((x, y))
+            x -= step_x
+            y -= step_y
+        node = parent[node]
+    path.reverse()
+    return path
+
+def dead_end_filled(grid, keep=()):
+    # Repeatedly walls up dead ends (open cells with at most one open neighbour)
+    # except the cells in `keep`. In a perfect maze only the path between the kept
+    # cells survives.
+    width, cells = grid.width, grid.cells
+    filled = grid.copy()
+    filled_cells = filled.cells
+    kept = {grid.index(*cell) for cell in keep}
+    degree = bytearray(len(cells))
+    dead_ends = []
+    for i, cell in enumerate(cells):
+        if cell == 0:
+            degree[i] = len(_open_neighbors(cells, width, i))
+            if degree[i] <= 1 and i not in kept:
+                dead_ends.append(i)
+    while dead_ends:
+        i = dead_ends.pop()
+        filled_cells[i] = 1
+        for neighbor in _open_neighbors(filled_cells, width, i):
+            degree[neighbor] -= 1
+            if degree[neighbor] == 1 and neighbor not in kept:
+                dead_ends.append(neighbor)
+    return filled
+
+def solve_dead_end_fill(grid, start, goal, stats=None):
+    filled = dead_end_filled(grid, (start, goal))
+    path = solve_bfs(filled, start, goal, stats)
+    if stats is not None:
+        stats["expanded"] += grid.cells.count(0)
+    return path
+
+# Junction graph: the maze compressed to its junctions, dead ends, start and exit,
+# with edges weighted by corridor length. Corridor cells (exactly two open
+# neighbours) are only walked through, which in a perfect maze leaves far fewer
+# nodes than open cells.
+class JunctionGraph:
+    __slots__ = ("grid", "edges")
+
+    def __init__(self, grid, extra_nodes=()):
+        self.grid = grid
+        cells, width = grid.cells, grid.width
+        nodes = {grid.index(*cell) for cell in extra_nodes}
+        for i, cell in enumerate(cells):
+            if cell == 0 and len(_open_neighbors(cells, width, i)) != 2:
+                nodes.add(i)
+        # edges[node] = [(other node, corridor length, first cell stepped into), ...]
+        self.edges = {node: [] for node in nodes}
+        for node in nodes:
+            for first in _open_neighbors(cells, width, node):
+                end, length = self.walk(node, first, self.edges)
+                self.edges[node].append((end, length, first))
+
+    def walk(self, origin, first, stops):
+        # Follows the corridor from origin through first until a cell in stops.
+        cells, width = self.grid.cells, self.grid.width
+        previous, current, length = origin, first, 1
+        while current not in stops and current != origin:
+            for neighbor in _open_neighbors(cells, width, current):
+                if neighbor != previous:
+                    break
+            else:
+                break
+            previous, current = current, neighbor
+            length += 1
+        return current, length
+
+    def walk_cells(self, origin, first, stop):
+        cells, width = self.grid.cells, self.grid.width
+        previous, current = origin, first
+        path = [current]
+        while current != stop:
+            for neighbor in _open_neighbors(cells, width, current):
+                if neighbor != previous:
+                    break
+            previous, current = current, neighbor
+            path.append(current)
+        return path
+
+    def dead_ends(self):
+        return [node for node, edges in self.edges.items() if len(edges) <= 1]
+
+    def attach(self, cell, stops):
+        # (node, distance, first step) for every node reachable from cell without
+        # passing another node; a node attaches to itself.
+        if cell in self.edges:
+            return [(cell, 0, None)]
+        cells, width = self.grid.cells, self.grid.width
+        ends = [self.walk(cell, first, stops) + (first,) for first in _open_neighbors(cells, width, cell)]
+        return [end for end in ends if end[0] in stops]
+
+    def shortest_path(self, start, goal, stats=None):
+        grid = self.grid
+        start_i, goal_i = grid.index(*start), grid.index(*goal)
+        if start_i == goal_i:
+            return []
+        edges = self.edges
+        # Walks from the goal, so reaching one of these nodes also reaches the goal.
+        goal_ends = {}
+        for node, length, first in self.attach(goal_i, edges):
+            if length < goal_ends.get(node, (UNREACHABLE,))[0]:
+                goal_ends[node] = (length, first)
+
+        dist = {}
+        parent = {}
+        heap = []
+        best, best_node = UNREACHABLE, None
+        for node, length, first in self.attach(start_i, edges.keys() | {goal_i}):
+            if node == goal_i and length < best:
+                best, best_node = length, None
+                # Recorded so a longer route relaxed into the goal node later
+                # cannot overwrite this parent.
+                dist[goal_i] = length
+                parent[goal_i] = (start_i, first)
+            elif length < dist.get(node, UNREACHABLE):
+                dist[node] = length
+                parent[node] = (start_i, first)
+                heapq.heappush(heap, (length, node))
+
+        expanded = 0
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d >= best:
+                break
+            if d > dist[node]:
+                continue
+            expanded += 1
+            if node in goal_ends and d + goal_ends[node][0] < best:
+                best, best_node = d + goal_ends[node][0], node
+            for other, length, first in edges[node]:
+                if d + length < dist.get(other, UNREACHABLE):
+                    dist[other] = d + length
+                    parent[other] = (node, first)
+                    heapq.heappush(heap, (d + length, other))
+        if stats is not None:
+            stats["expanded"] = expanded
+        if best == UNREACHABLE:
+            return None
+
+        if best_node is None and goal_i not in edges:
+            segments = [(start_i, parent[goal_i][1], goal_i)]
+            tail = []
+        else:
+            node = best_node if best_node is not None else goal_i
+            segments = []
+            while node != start_i:
+                origin, first = parent[node]
+                segments.append((origin, first, node))
+                node = origin
+            segments.reverse()
+            tail = []
+            if goal_i not in edges:
+                length, first = goal_ends[best_node]
+                tail = self.walk_cells(goal_i, first, best_node)[::-1][1:] + [goal_i]
+        path = []
+        for origin, first, stop in segments:
+            path.extend(self.walk_cells(origin, first, stop))
+        path.extend(tail)
+        return [grid.coords(i) for i in path]
+
+junction_graph_cache = OrderedDict()
+junction_graph_lock = threading.Lock()
+
+def get_junction_graph(grid):
+    # Built once per maze (with its start and exit as nodes) and shared by the
+    # solver and power-up placement; the two most recent mazes are kept, and the
+    # maze being played is never evicted by the pool's background builds.
+    with junction_graph_lock:
+        graph = junction_graph_cache.get(grid)
+        if graph is not None:
+            junction_graph_cache.move_to_end(grid)
+            return graph
+    graph = JunctionGraph(grid, [cell for cell in find_start_exit(grid) if cell is not None])
+    with junction_graph_lock:
+        junction_graph_cache[grid] = graph
+        for key in list(junction_graph_cache):
+            if len(junction_graph_cache) <= 2:
+                break
+            if key is not maze:
+                del junction_graph_cache[key]
+    return graph
+
+def solve_junction_graph(grid, start, goal, stats=None):
+    return get_junction_graph(grid).shortest_path(start, goal, stats)
+
+SOLVERS = {
+    "bfs": solve_bfs,
+    "astar": solve_astar,
+    "bidirectional": solve_bidirectional_bfs,
+    "jps": solve_jps,
+    "dead_end_fill": solve_dead_end_fill,
+    "junction_graph": solve_junction_graph,
+}
+
+def benchmark_solvers(sizes=(101, 501, 1001), solvers=None, algorithm=DEFAULT_MAZE_ALGORITHM):
+    for size in sizes:
+        grid = maze_generate_data(size, size, algorithm, random.Random(size))
+        start, goal = find_start_exit(grid)
+        for name in solvers or SOLVERS:
+            stats = {}
+            began = time.perf_counter()
+            path = SOLVERS[name](grid, start, goal, stats)
+            elapsed = time.perf_counter() - began
+            yield {"benchmark": "solver", "solver": name, "algorithm": algorithm, "size": size,
+                   "seconds": round(elapsed, 4), "expanded": stats.get("expanded"),
+                   "length": len(path) if path is not None else None}
+
+# Incremental hints: the last full hint path is kept (with a cell -> index map) so
+# a new hint from a cell on it is just a slice, and a player who wandered off gets
+# a short local BFS back onto it. Only if that fails is a full search run.
+HINT_REPAIR_RADIUS = 32
+hint_cache = None
+hint_cache_index = None
+hint_cache_key = None
+
+def local_path_to_cached(start, radius=HINT_REPAIR_RADIUS):
+    parent = {start: None}
+    frontier = [start]
+    for _ in range(radius):
+        next_frontier = []
+        for x, y in frontier:
+            for cell in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)):
+                if cell in parent or not maze.is_open(*cell):
+                    continue
+                parent[cell] = (x, y)
+                if cell in hint_cache_index:
+                    path = []
+                    while cell != start:
+                        path.append(cell)
+                        cell = parent[cell]
+                    path.reverse()
+                    return path
+                next_frontier.append(cell)
+        frontier = next_frontier
     return None
 
-# Power-ups
-power_ups = []
+def incremental_hint_path(start, solver=None):
+    global hint_cache, hint_cache_index, hint_cache_key
+    start = tuple(start)
+    if hint_cache_key == (maze, tuple(exit_pos)) and hint_cache is not None:
+        i = hint_cache_index.get(start)
+        if i is not None:
+            return hint_cache[i + 1:]
+        repair = local_path_to_cached(start)
+        if repair:
+            return repair + hint_cache[hint_cache_index[repair[-1]] + 1:]
+
+    path = find_hint_path(start, solver)
+    if path is None:
+        return None
+    hint_cache = [start] + path
+    hint_cache_index = {cell: i for i, cell in enumerate(hint_cache)}
+    hint_cache_key = (maze, tuple(exit_pos))
+    return path
+
+# Power-ups, indexed by cell so pickup is a dict lookup. The dense mode scales
+# the count with the maze area (thousands on the huge maze).
+POWER_UP_PLACEMENT = "dead_ends"
+POWER_UP_COUNT = 5
+POWER_UP_DENSITY = 0.005  # power-ups per cell in dense mode
+dense_power_ups = False
+power_ups = {}
 
 class PowerUp:
+    __slots__ = ("x", "y", "type")
+
     def __init__(self, x, y, type_):
         self.x = x
         self.y = y
         self.type = type_
-        self.collected = False
 
-def place_power_ups(count=5):
+def power_up_count(grid):
+    if dense_power_ups:
+        return max(POWER_UP_COUNT, int(grid.width * grid.height * POWER_UP_DENSITY))
+    return POWER_UP_COUNT
+
+def sample_open_cells(grid, count, rng=random, reserved=()):
+    # Rejection sampling over random indices; mazes are about half open, so this
+    # takes roughly 2 * count draws. If open cells turn out to be scarce it falls
+    # back to one reservoir-sampling pass. Neither builds a list of empty cells.
+    cells = grid.cells
+    chosen = {}
+    for _ in range(20 * count):
+        if len(chosen) == count:
+            break
+        i = rng.randrange(len(cells))
+        if cells[i] == 0 and i not in reserved:
+            chosen[i] = None
+    if len(chosen) < count:
+        chosen = []
+        seen = 0
+        i = cells.find(0)
+        while i >= 0:
+            if i not in reserved:
+                if seen < count:
+                    chosen.append(i)
+                else:
+                    j = rng.randrange(seen + 1)
+                    if j < count:
+                        chosen[j] = i
+                seen += 1
+            i = cells.find(0, i + 1)
+    return [grid.coords(i) for i in chosen]
+
+def choose_power_up_cells(grid, count=None, rng=random, placement=None):
+    # "dead_ends" puts power-ups at the junction graph's dead ends (never the start
+    # or exit) so they reward exploring; it falls back to any empty cell when the
+    # maze has too few dead ends.
+    if count is None:
+        count = power_up_count(grid)
+    reserved = {grid.index(*cell) for cell in find_start_exit(grid) if cell is not None}
+    if (placement or POWER_UP_PLACEMENT) == "dead_ends":
+        dead_ends = sorted(i for i in get_junction_graph(grid).dead_ends() if i not in reserved)
+        if len(dead_ends) >= count:
+            return [grid.coords(i) for i in rng.sample(dead_ends, count)]
+    return sample_open_cells(grid, count, rng, reserved)
+
+def place_power_ups(count=None, cells=None):
     global power_ups
-    power_ups = []
-    empty_cells = [(x, y) for y in range(MAZE_HEIGHT) for x in range(MAZE_WIDTH) if maze[y][x] == 0]
-    random.shuffle(empty_cells)
-    for _ in range(count):
-        if empty_cells:
-            x,y = empty_cells.pop()
-            power_ups.append(PowerUp(x, y, "hint"))
+    if cells is None:
+        cells = choose_power_up_cells(maze, count, random.Random(f"power-ups:{current_maze_seed}"))
+    power_ups = {(x, y): PowerUp(x, y, "hint") for x, y in cells}
 
 def draw_power_ups(offset_x=0, offset_y=0):
+    # Walks whichever is smaller: the visible cells (dirty-rect frames, zoomed-in
+    # views) or the power-ups themselves.
     hint_color = (255, 200, 0)
-    for pu in power_ups:
-        if not pu.collected:
-            rect = pygame.Rect(offset_x + pu.x*CELL_SIZE*zoom_level + CELL_SIZE*zoom_level/3,
-                               offset_y + pu.y*CELL_SIZE*zoom_level + CELL_SIZE*zoom_level/3,
-                               CELL_SIZE*zoom_level/3, CELL_SIZE*zoom_level/3)
-            color = hint_color if pu.type == "hint" else hint_color
-            pygame.draw.ellipse(screen, color, rect)
+    x0, y0, x1, y1 = visible_cell_range(offset_x, offset_y)
+    if (x1 - x0) * (y1 - y0) < len(power_ups):
+        visible = [power_ups[cell] for cell in ((x, y) for y in range(y0, y1) for x in range(x0, x1))
+                   if cell in power_ups]
+    else:
+        visible = [pu for pu in power_ups.values() if x0 <= pu.x < x1 and y0 <= pu.y < y1]
+    for pu in visible:
+        rect = pygame.Rect(offset_x + pu.x*CELL_SIZE*zoom_level + CELL_SIZE*zoom_level/3,
+                           offset_y + pu.y*CELL_SIZE*zoom_level + CELL_SIZE*zoom_level/3,
+                           CELL_SIZE*zoom_level/3, CELL_SIZE*zoom_level/3)
+        pygame.draw.ellipse(screen, hint_color, rect)
 
 def collect_power_up():
-    global power_ups, hint_path, hint_start_time
-    for pu in power_ups:
-        if not pu.collected and pu.x == player_pos[0] and pu.y == player_pos[1]:
-            pu.collected = True
-            if pu.type == "hint":
-                path = bfs_shortest_path(tuple(player_pos), tuple(exit_pos))
-                if path:
-                    hint_path = path
-                    hint_start_time = pygame.time.get_ticks()
+    global hint_path, hint_start_time
+    pu = power_ups.pop(tuple(player_pos), None)
+    if pu is not None and pu.type == "hint":
+        path = incremental_hint_path(player_pos, hint_solver)
+        if path:
+            hint_path = path
+            hint_start_time = pygame.time.get_ticks()
+
+def maze_offsets():
+    return ((SCREEN_WIDTH - CELL_SIZE * MAZE_WIDTH * zoom_level) // 2 + pan_offset_x,
+            (SCREEN_HEIGHT - INFO_BAR_HEIGHT - CELL_SIZE * MAZE_HEIGHT * zoom_level) // 2 + pan_offset_y)
+
+def maze_fits_view():
+    return (CELL_SIZE * MAZE_WIDTH * zoom_level <= SCREEN_WIDTH
+            and CELL_SIZE * MAZE_HEIGHT * zoom_level <= SCREEN_HEIGHT - INFO_BAR_HEIGHT)
+
+def center_view_on(cell):
+    # Used for mazes bigger than the screen (e.g. Huge) to keep the player in view.
+    global pan_offset_x, pan_offset_y
+    size = CELL_SIZE * zoom_level
+    pan_offset_x = SCREEN_WIDTH // 2 - size * (cell[0] + 0.5) - (SCREEN_WIDTH - size * MAZE_WIDTH) // 2
+    pan_offset_y = ((SCREEN_HEIGHT - INFO_BAR_HEIGHT) // 2 - size * (cell[1] + 0.5)
+                    - (SCREEN_HEIGHT - INFO_BAR_HEIGHT - size * MAZE_HEIGHT) // 2)
+
+# Background maze pre-generation
+class PreparedMaze:
+    # A generated maze with everything "new maze" needs already worked out.
+    __slots__ = ("grid", "algorithm", "seed", "start", "exit", "power_up_cells", "exit_distance")
+
+    def __init__(self, grid, algorithm, seed, start, exit, power_up_cells, exit_distance):
+        self.grid = grid
+        self.algorithm = algorithm
+        self.seed = seed
+        self.start = start
+        self.exit = exit
+        self.power_up_cells = power_up_cells
+        self.exit_distance = exit_distance
+
+def prepare_maze(width, height, seed=None, algorithm=None):
+    if seed is None:
+        seed = new_maze_seed()
+    algorithm = resolve_maze_algorithm(algorithm or DEFAULT_MAZE_ALGORITHM)
+    grid = generate_seeded_maze(algorithm, width, height, seed)
+    start, exit = find_start_exit(grid)
+    power_up_cells = choose_power_up_cells(grid, rng=random.Random(f"power-ups:{seed}"))
+    return PreparedMaze(grid, algorithm, seed, start, exit, power_up_cells,
+                        compute_distance_field(grid, exit))
+
+class MazePool:
+    # A daemon thread keeps up to `depth` ready mazes per size and refills the
+    # queue of the currently selected size, so taking a maze is an O(1) pop.
+    def __init__(self, depth=2):
+        self.depth = depth
+        self.size = None
+        self.ready = {}
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def select(self, size):
+        if self.thread is not None and self.size == tuple(size):
+            return
+        with self.condition:
+            self.size = tuple(size)
+            self.ready.setdefault(self.size, deque())
+            self.condition.notify()
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._fill, name="maze-pool", daemon=True)
+            self.thread.start()
+
+    def take(self, size):
+        size = tuple(size)
+        with self.condition:
+            queue = self.ready.get(size)
+            if queue:
+                prepared = queue.popleft()
+                self.condition.notify()
+                return prepared
+        return prepare_maze(*size)
+
+    def _fill(self):
+        while True:
+            with self.condition:
+                while len(self.ready[self.size]) >= self.depth:
+                    self.condition.wait()
+                size = self.size
+            prepared = prepare_maze(*size)
+            with self.condition:
+                if len(self.ready[size]) < self.depth:
+                    self.ready[size].append(prepared)
+
+maze_pool = MazePool()
+installed_maze = None
+
+def install_maze(prepared):
+    global maze, MAZE_WIDTH, MAZE_HEIGHT, player_pos, exit_pos
+    global current_maze_algorithm, current_maze_seed, exit_distance, installed_maze
+    installed_maze = prepared
+    maze = prepared.grid
+    exit_distance = prepared.exit_distance
+    current_maze_algorithm, current_maze_seed = prepared.algorithm, prepared.seed
+    MAZE_WIDTH, MAZE_HEIGHT = maze.width, maze.height
+    player_pos, exit_pos = list(prepared.start), list(prepared.exit)
+    cells = prepared.power_up_cells
+    if len(cells) != power_up_count(maze):
+        # Prepared before the power-up mode was changed.
+        cells = prepared.power_up_cells = choose_power_up_cells(
+            maze, rng=random.Random(f"power-ups:{prepared.seed}"))
+    place_power_ups(cells=cells)
+
+def restart_maze():
+    # Restarting puts back the installed maze's own start and power-ups; a maze
+    # restored from a save has no PreparedMaze, so its placement is redone from
+    # the seed.
+    global player_pos, exit_pos
+    if installed_maze is not None and installed_maze.grid is maze:
+        install_maze(installed_maze)
+        return
+    player_pos, exit_pos = find_start_exit()
+    place_power_ups()
 
 def zoom_in():
     global zoom_level
@@ -484,198 +2283,285 @@ def handle_pan_event(event):
 
 def draw_menu_selected(selected_idx, options, title="Menu", subtitle=None):
     screen.fill(current_theme["background"])
-    title_text = font_menu.render(title, True, current_theme["text"])
+    title_text = render_text(font_menu, title, current_theme["text"])
     title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//6))
     screen.blit(title_text, title_rect)
 
     for i, option in enumerate(options):
         color = current_theme["highlight"] if i == selected_idx else current_theme["text"]
-        option_text = font_large.render(option, True, color)
+        option_text = render_text(font_large, option, color)
         option_rect = option_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//3 + i*60))
         screen.blit(option_text, option_rect)
 
     if subtitle:
-        subtitle_text = font.render(subtitle, True, current_theme["text"])
+        subtitle_text = render_text(font, subtitle, current_theme["text"])
         subtitle_rect = subtitle_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 50))
         screen.blit(subtitle_text, subtitle_rect)
 
     pygame.display.flip()
 
+# Menus are event-driven: MenuScreen.events blocks in pygame.event.wait until there
+# is input, waking every MENU_WAKE_INTERVAL ms so background state (save results,
+# toasts) can be picked up, and MenuScreen.show draws and flips only when what the
+# menu displays has changed. An idle menu costs next to no CPU.
+MENU_WAKE_INTERVAL = 500  # ms
+MENU_REDRAW_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)
+menu_screen_owner = None
+
+class MenuScreen:
+    __slots__ = ("drawn",)
+
+    def __init__(self):
+        self.drawn = None
+
+    def show(self, draw, *state):
+        # Redraws when the state differs from the last frame or when something
+        # else (a submenu) has drawn over the screen since.
+        global menu_screen_owner
+        if state != self.drawn or menu_screen_owner is not self:
+            draw(*state)
+            self.drawn = state
+            menu_screen_owner = self
+
+    def invalidate(self):
+        self.drawn = None
+
+    def events(self, timeout=MENU_WAKE_INTERVAL):
+        # Key presses since the last call, after waiting up to `timeout` ms for the
+        # first event. Quitting is handled here for every menu.
+        first = pygame.event.wait(timeout)
+        keys = []
+        for event in ([] if first.type == pygame.NOEVENT else [first]) + pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.KEYDOWN:
+                keys.append(event.key)
+            elif event.type in MENU_REDRAW_EVENTS:
+                self.invalidate()
+        return keys
+
 def main_menu():
     options = ["Start Game", "Leaderboard", "Settings", "Exit"]
+    if os.path.exists(AUTOSAVE_FILE):
+        options.insert(0, "Continue")
     selected = 0
+    menu = MenuScreen()
     while True:
-        draw_menu_selected(selected, options, title="Maze Explorer 2D")
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+        menu.show(draw_menu_selected, selected, options, "Maze Explorer 2D")
+        for key in menu.events():
+            if key == pygame.K_UP:
+                selected = (selected - 1) % len(options)
+            elif key == pygame.K_DOWN:
+                selected = (selected + 1) % len(options)
+            elif key == pygame.K_RETURN:
+                return options[selected]
+            elif key == pygame.K_ESCAPE:
                 pygame.quit()
                 sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    selected = (selected - 1) % len(options)
-                elif event.key == pygame.K_DOWN:
-                    selected = (selected + 1) % len(options)
-                elif event.key == pygame.K_RETURN:
-                    return options[selected]
-                elif event.key == pygame.K_ESCAPE:
-                    pygame.quit()
-                    sys.exit()
-        clock.tick(30)
 
 def choose_maze_size_menu():
-    options = ["Small (15x15)", "Medium (21x21)", "Large (31x31)"]
+    options = ["Small (15x15)", "Medium (21x21)", "Large (31x31)", "Huge (1001x1001)"]
     selected = current_size_index
+    menu = MenuScreen()
     while True:
-        draw_menu_selected(selected, options, title="Choose Difficulty")
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    selected = (selected - 1) % len(options)
-                elif event.key == pygame.K_DOWN:
-                    selected = (selected + 1) % len(options)
-                elif event.key == pygame.K_RETURN:
-                    return difficulty_sizes[selected], selected
-                elif event.key == pygame.K_ESCAPE:
-                    return None, None
-        clock.tick(30)
+        maze_pool.select(difficulty_sizes[selected])
+        menu.show(draw_menu_selected, selected, options, "Choose Difficulty")
+        for key in menu.events():
+            if key == pygame.K_UP:
+                selected = (selected - 1) % len(options)
+            elif key == pygame.K_DOWN:
+                selected = (selected + 1) % len(options)
+            elif key == pygame.K_RETURN:
+                return difficulty_sizes[selected], selected
+            elif key == pygame.K_ESCAPE:
+                return None, None
 
 def theme_select_menu():
     options = list(THEMES.keys())
     selected = options.index(current_theme_name)
+    menu = MenuScreen()
     while True:
-        draw_menu_selected(selected, options, title="Select Theme")
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    selected = (selected - 1) % len(options)
-                elif event.key == pygame.K_DOWN:
-                    selected = (selected + 1) % len(options)
-                elif event.key == pygame.K_RETURN:
-                    return options[selected]
-                elif event.key == pygame.K_ESCAPE:
-                    return None
-        clock.tick(30)
+        menu.show(draw_menu_selected, selected, options, "Select Theme")
+        for key in menu.events():
+            if key == pygame.K_UP:
+                selected = (selected - 1) % len(options)
+            elif key == pygame.K_DOWN:
+                selected = (selected + 1) % len(options)
+            elif key == pygame.K_RETURN:
+                return options[selected]
+            elif key == pygame.K_ESCAPE:
+                return None
 
 def settings_menu():
-    global current_theme_name, current_theme, show_hint_path
-    options = ["Select Theme", "Toggle Hint Path Visibility", "Back"]
+    global current_theme_name, current_theme, show_hint_path, dense_power_ups
+    options = ["Select Theme", "Toggle Hint Path Visibility", "Power-ups", "Back"]
     selected = 0
+    menu = MenuScreen()
     while True:
-        display_values = ["On" if show_hint_path else "Off"]
+        display_values = ["On" if show_hint_path else "Off", "Dense" if dense_power_ups else "Normal"]
         option_display = [
             f"{options[0]}: {current_theme_name}",
             f"{options[1]}: {display_values[0]}",
-            options[2]
+            f"{options[2]}: {display_values[1]}",
+            options[3]
         ]
-        draw_menu_selected(selected, option_display, title="Settings")
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    selected = (selected - 1) % len(options)
-                elif event.key == pygame.K_DOWN:
-                    selected = (selected + 1) % len(options)
-                elif event.key == pygame.K_RETURN:
-                    if selected == 0:
-                        chosen = theme_select_menu()
-                        if chosen:
-                            current_theme_name = chosen
-                            current_theme = THEMES[chosen]
-                    elif selected == 1:
-                        show_hint_path = not show_hint_path
-                    elif selected == 2:
-                        return
-                elif event.key == pygame.K_ESCAPE:
+        menu.show(draw_menu_selected, selected, option_display, "Settings")
+        for key in menu.events():
+            if key == pygame.K_UP:
+                selected = (selected - 1) % len(options)
+            elif key == pygame.K_DOWN:
+                selected = (selected + 1) % len(options)
+            elif key == pygame.K_RETURN:
+                if selected == 0:
+                    chosen = theme_select_menu()
+                    if chosen:
+                        current_theme_name = chosen
+                        current_theme = THEMES[chosen]
+                elif selected == 1:
+                    show_hint_path = not show_hint_path
+                elif selected == 2:
+                    dense_power_ups = not dense_power_ups
+                elif selected == 3:
                     return
-        clock.tick(30)
-
-def draw_leaderboard_menu():
-    leaderboard = load_leaderboard()
-    selected = 0
-    while True:
-        screen.fill(current_theme["background"])
-        title_text = font_menu.render("Leaderboard - Top Times", True, current_theme["text"])
-        title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//8))
-        screen.blit(title_text, title_rect)
+            elif key == pygame.K_ESCAPE:
+                return
 
-        for i, entry in enumerate(leaderboard):
-            text = f"{i+1}. Time: {entry['time']}s, Steps: {entry['steps']}"
-            color = current_theme["highlight"] if i == selected else current_theme["text"]
-            entry_text = font_large.render(text, True, color)
-            entry_rect = entry_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//4 + i*40))
-            screen.blit(entry_text, entry_rect)
+def draw_leaderboard(label, leaderboard, selected, status):
+    screen.fill(current_theme["background"])
+    title_text = render_text(font_menu, f"Leaderboard - {label}", current_theme["text"])
+    title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//8))
+    screen.blit(title_text, title_rect)
 
-        instructions = font.render("Press ESC to return", True, current_theme["text"])
-        instr_rect = instructions.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 40))
-        screen.blit(instructions, instr_rect)
+    for i, entry in enumerate(leaderboard):
+        text = f"{i+1}. Time: {entry['time']}s, Steps: {entry['steps']}"
+        if entry["seed"] is not None:
+            text += f", Seed: {entry['seed']}"
+        if entry["replay"]:
+            text += " [Replay]"
+        color = current_theme["highlight"] if i == selected else current_theme["text"]
+        entry_text = render_text(font_large, text, color)
+        entry_rect = entry_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//4 + i*40))
+        screen.blit(entry_text, entry_rect)
+
+    instructions = render_text(font, status or "UP/DOWN: Select | ENTER: Watch replay | LEFT/RIGHT: Difficulty | ESC: Return",
+                               current_theme["text"])
+    instr_rect = instructions.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 40))
+    screen.blit(instructions, instr_rect)
 
-        pygame.display.flip()
+    pygame.display.flip()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    return
-        clock.tick(30)
+def draw_leaderboard_menu():
+    partitions = leaderboard_partitions()
+    partition = difficulty_sizes[current_size_index]
+    partition = partitions.index(partition) if partition in partitions else 0
+    leaderboard = load_leaderboard(partitions[partition])
+    selected = 0
+    status = None
+    menu = MenuScreen()
+    while True:
+        width, height = partitions[partition]
+        label = f"{width}x{height}" if width else "Imported"
+        menu.show(draw_leaderboard, label, leaderboard, selected, status)
+        for key in menu.events():
+            if key == pygame.K_ESCAPE:
+                return
+            elif key in (pygame.K_LEFT, pygame.K_RIGHT):
+                step = 1 if key == pygame.K_RIGHT else -1
+                partition = (partition + step) % len(partitions)
+                leaderboard = load_leaderboard(partitions[partition])
+                selected = 0
+            elif key in (pygame.K_UP, pygame.K_DOWN) and leaderboard:
+                step = 1 if key == pygame.K_DOWN else -1
+                selected = (selected + step) % len(leaderboard)
+            elif key == pygame.K_RETURN and leaderboard:
+                status = None
+                path = leaderboard[selected]["replay"]
+                try:
+                    if not path or not playback_loop(Replay.read(path)):
+                        status = "No playable replay for this entry"
+                except (OSError, ValueError, struct.error) as e:
+                    print("Replay load failed:", e)
+                    status = "Replay could not be loaded"
+                menu.invalidate()
 
 def draw_pause_menu():
     global paused, pause_menu_index
     options = ["Resume", "Restart", "New Maze", "Save Game", "Load Game", "Settings", "Main Menu", "Quit"]
+    menu = MenuScreen()
     while paused:
-        draw_menu_selected(pause_menu_index, options, title="Paused")
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    pause_menu_index = (pause_menu_index - 1) % len(options)
-                elif event.key == pygame.K_DOWN:
-                    pause_menu_index = (pause_menu_index + 1) % len(options)
-                elif event.key == pygame.K_RETURN:
-                    choice = options[pause_menu_index]
-                    if choice == "Resume":
-                        return "resume"
-                    elif choice == "Restart":
-                        return "restart"
-                    elif choice == "New Maze":
-                        return "new_maze"
-                    elif choice == "Save Game":
-                        saved = save_game()
-                        if saved:
-                            draw_info_bar(["Game saved successfully!"], GREEN)
-                        else:
-                            draw_info_bar(["Game save failed!"], RED)
-                        pygame.display.flip()
-                        pygame.time.delay(1500)
-                    elif choice == "Load Game":
-                        loaded = load_game()
-                        if loaded:
-                            draw_info_bar(["Game loaded!"], GREEN)
-                        else:
-                            draw_info_bar(["Load failed!"], RED)
-                        pygame.display.flip()
-                        pygame.time.delay(1500)
-                    elif choice == "Settings":
-                        settings_menu()
-                    elif choice == "Main Menu":
-                        return "main_menu"
-                    elif choice == "Quit":
-                        pygame.quit()
-                        sys.exit()
-                elif event.key == key_bindings["PAUSE"][0]:
+        process_io_results()
+        toast = active_toast()
+        menu.show(draw_menu_selected, pause_menu_index, options, "Paused", toast[0] if toast else None)
+        for key in menu.events():
+            if key == pygame.K_UP:
+                pause_menu_index = (pause_menu_index - 1) % len(options)
+            elif key == pygame.K_DOWN:
+                pause_menu_index = (pause_menu_index + 1) % len(options)
+            elif key == pygame.K_RETURN:
+                choice = options[pause_menu_index]
+                if choice == "Resume":
                     return "resume"
-        clock.tick(30)
+                elif choice == "Restart":
+                    return "restart"
+                elif choice == "New Maze":
+                    return "new_maze"
+                elif choice == "Save Game":
+                    save_game_async()
+                elif choice == "Load Game":
+                    load_game_async()
+                elif choice == "Settings":
+                    settings_menu()
+                elif choice == "Main Menu":
+                    return "main_menu"
+                elif choice == "Quit":
+                    pygame.quit()
+                    sys.exit()
+            elif key == key_bindings["PAUSE"][0]:
+                return "resume"
+
+def request_full_redraw():
+    global full_redraw
+    full_redraw = True
+
+def mark_cell_dirty(x, y):
+    dirty_cells.append((x, y))
+
+def cell_screen_rect(x, y, offset_x, offset_y):
+    size = CELL_SIZE * zoom_level
+    return pygame.Rect(int(offset_x + x*size) - 1, int(offset_y + y*size) - 1, int(size) + 3, int(size) + 3)
+
+def draw_game_frame(offset_x, offset_y, info_lines, info_color):
+    screen.fill(current_theme["background"])
+    draw_maze(hint_path, offset_x, offset_y)
+    draw_power_ups(offset_x, offset_y)
+    draw_exit(exit_pos, highlight=True, offset_x=offset_x, offset_y=offset_y)
+    draw_player(player_pos, offset_x=offset_x, offset_y=offset_y)
+    if win:
+        draw_win_message()
+    draw_info_bar(info_lines, info_color)
+
+def render_game_frame(offset_x, offset_y, info_lines, info_color):
+    # Full frames are flipped; otherwise only the changed cells and the info bar
+    # (when its text changed) are redrawn under a clip and pushed with update(rects).
+    # Idle frames draw nothing at all.
+    global full_redraw, drawn_info
+    info = (tuple(info_lines), info_color)
+    if full_redraw or not DIRTY_RECT_RENDERING:
+        draw_game_frame(offset_x, offset_y, info_lines, info_color)
+        pygame.display.flip()
+    else:
+        rects = [cell_screen_rect(x, y, offset_x, offset_y) for x, y in dirty_cells]
+        if info != drawn_info:
+            rects.append(pygame.Rect(0, SCREEN_HEIGHT - INFO_BAR_HEIGHT, SCREEN_WIDTH, INFO_BAR_HEIGHT))
+        if rects:
+            screen.set_clip(rects[0].unionall(rects[1:]))
+            draw_game_frame(offset_x, offset_y, info_lines, info_color)
+            screen.set_clip(None)
+            pygame.display.update(rects)
+    full_redraw = False
+    dirty_cells.clear()
+    drawn_info = info
 
 def draw_win_message():
     overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT - INFO_BAR_HEIGHT))
@@ -684,14 +2570,14 @@ def draw_win_message():
     screen.blit(overlay, (0, 0))
     msg1 = "🎉 You found the exit! 🎉"
     msg2 = "Press N for New Maze, R to Restart, M for Menu, or ESC to Quit"
-    text1 = font_large.render(msg1, True, (50, 255, 50))
-    text2 = font.render(msg2, True, (50, 255, 50))
+    text1 = render_text(font_large, msg1, (50, 255, 50))
+    text2 = render_text(font, msg2, (50, 255, 50))
     rect1 = text1.get_rect(center=(SCREEN_WIDTH // 2, (SCREEN_HEIGHT - INFO_BAR_HEIGHT) // 2 - 20))
     rect2 = text2.get_rect(center=(SCREEN_WIDTH // 2, (SCREEN_HEIGHT - INFO_BAR_HEIGHT) // 2 + 30))
     screen.blit(text1, rect1)
     screen.blit(text2, rect2)
 
-def game_loop(maze_width, maze_height):
+def game_loop(maze_width, maze_height, resume=False):
     global MAZE_WIDTH, MAZE_HEIGHT, maze, SCREEN_WIDTH, SCREEN_HEIGHT, screen, CELL_SIZE
     global player_pos, exit_pos, trail, win, steps, start_time
     global hint_path, hint_start_time, show_hint_path
@@ -716,18 +2602,27 @@ def game_loop(maze_width, maze_height):
     if zoom_level < min_zoom or zoom_level > max_zoom:
         zoom_level = 1.0
 
-    trail = []
+    if not resume:
+        trail = Trail(MAZE_WIDTH, MAZE_HEIGHT)
+        steps = 0
+        start_time = pygame.time.get_ticks()
+        begin_replay()
     win = False
-    steps = 0
-    start_time = pygame.time.get_ticks()
+    win_recorded = player_pos == exit_pos
     hint_path = None
     hint_start_time = None
+    begin_journal()
 
     keys_pressed = set()
     MOVE_DELAY = 150
     last_move_time = 0
 
-    place_power_ups()
+    if not maze_fits_view():
+        center_view_on(player_pos)
+
+    request_full_redraw()
+    drawn_view = None
+    drawn_hint_path = None
 
     running = True
     while running:
@@ -757,6 +2652,9 @@ def game_loop(maze_width, maze_height):
                     if paused:
                         result = draw_pause_menu()
                         paused = False
+                        request_full_redraw()
+                        # A game may have been loaded from the pause menu.
+                        win_recorded = player_pos == exit_pos
                         if result == "restart":
                             return "restart_same"
                         elif result == "new_maze":
@@ -772,93 +2670,207 @@ def game_loop(maze_width, maze_height):
                 elif event.key in key_bindings["MENU"] and not paused:
                     return "main_menu"
                 elif event.key in key_bindings["HINT"] and not paused:
-                    path = bfs_shortest_path(tuple(player_pos), tuple(exit_pos))
+                    path = incremental_hint_path(player_pos, hint_solver)
                     if path:
                         hint_path = path
                         hint_start_time = current_time
                 elif event.key in key_bindings["TOGGLE_HINT"]:
                     show_hint_path = not show_hint_path
                 elif event.key in key_bindings["SAVE"]:
-                    if save_game():
-                        draw_info_bar(["Game saved successfully!"], (50, 255, 50))
-                    else:
-                        draw_info_bar(["Game save failed!"], (255, 0, 0))
-                    pygame.display.flip()
-                    pygame.time.delay(1000)
+                    save_game_async()
                 elif event.key in key_bindings["LOAD"]:
-                    if load_game():
-                        draw_info_bar(["Game loaded!"], (50, 255, 50))
-                    else:
-                        draw_info_bar(["Load failed!"], (255, 0, 0))
-                    pygame.display.flip()
-                    pygame.time.delay(1000)
+                    load_game_async()
 
             if event.type == pygame.KEYUP:
                 keys_pressed.discard(event.key)
 
+        if process_io_results():
+            request_full_redraw()
+            win_recorded = player_pos == exit_pos
+
         if hint_path and current_time - hint_start_time > HINT_DURATION:
             hint_path = None
+            release_hint_overlay()
 
         if not win and not paused and current_time - last_move_time > MOVE_DELAY:
             direction_map = {}
-            for d in ["UP", "DOWN", "LEFT", "RIGHT"]:
+            for direction, d in enumerate(["UP", "RIGHT", "DOWN", "LEFT"]):
                 for k in key_bindings[d]:
-                    direction_map[k] = {
-                        "UP": (0, -1),
-                        "DOWN": (0, 1),
-                        "LEFT": (-1, 0),
-                        "RIGHT": (1, 0)
-                    }[d]
+                    direction_map[k] = direction
 
             moved = False
             for k in keys_pressed:
-                if k in direction_map and can_move(player_pos, direction_map[k]):
-                    dx, dy = direction_map[k]
-                    trail.append(player_pos[:])
+                if k in direction_map and can_move(player_pos, MOVE_DIRECTIONS[direction_map[k]]):
+                    dx, dy = MOVE_DIRECTIONS[direction_map[k]]
+                    visit_trail_cell(*player_pos)
+                    mark_cell_dirty(player_pos[0], player_pos[1])
                     player_pos[0] += dx
                     player_pos[1] += dy
+                    mark_cell_dirty(player_pos[0], player_pos[1])
                     steps += 1
+                    # Recorded before journalling: journal_move may snapshot the run.
+                    current_replay.record(direction_map[k], current_time - start_time)
+                    journal_move(direction_map[k], current_time - start_time)
                     moved = True
                     collect_power_up()
                     break
             if moved:
                 last_move_time = current_time
+                if not maze_fits_view():
+                    x0, y0, x1, y1 = visible_cell_range(*maze_offsets())
+                    if not (x0 + 2 <= player_pos[0] < x1 - 2 and y0 + 2 <= player_pos[1] < y1 - 2):
+                        center_view_on(player_pos)
 
         win = (player_pos == exit_pos)
 
-        screen.fill(current_theme["background"])
-
-        top_offset_x = (SCREEN_WIDTH - CELL_SIZE * MAZE_WIDTH * zoom_level) // 2 + pan_offset_x
-        top_offset_y = (SCREEN_HEIGHT - INFO_BAR_HEIGHT - CELL_SIZE * MAZE_HEIGHT * zoom_level) // 2 + pan_offset_y
+        top_offset_x, top_offset_y = maze_offsets()
 
-        draw_maze(hint_path, top_offset_x, top_offset_y)
-        draw_power_ups(top_offset_x, top_offset_y)
-        draw_exit(exit_pos, highlight=True, offset_x=top_offset_x, offset_y=top_offset_y)
-        draw_player(player_pos, trail, offset_x=top_offset_x, offset_y=top_offset_y)
+        view = (top_offset_x, top_offset_y, zoom_level, CELL_SIZE, current_theme_name, show_hint_path, win)
+        if view != drawn_view:
+            request_full_redraw()
+            drawn_view = view
+        if hint_path is not drawn_hint_path:
+            for path in (drawn_hint_path, hint_path):
+                for cx, cy in path or ():
+                    mark_cell_dirty(cx, cy)
+            drawn_hint_path = hint_path
 
         elapsed_sec = (current_time - start_time) // 1000
 
         if win:
-            draw_win_message()
-            save_leaderboard(elapsed_sec, steps)
-            draw_info_bar([
+            if not win_recorded:
+                save_leaderboard(elapsed_sec, steps, replay=save_replay(current_replay))
+                win_recorded = True
+            info_lines = [
                 f"Time: {elapsed_sec}s | Steps: {steps}",
                 f"N: New Maze | R: Restart | M: Menu | ESC: Quit"
-            ], (50, 255, 50))
+            ]
+            info_color = (50, 255, 50)
         else:
-            draw_info_bar([
+            info_lines = [
                 "Use WASD/Arrow keys to move. P: Pause",
-                f"Time: {elapsed_sec}s | Steps: {steps}",
+                f"Time: {elapsed_sec}s | Steps: {steps} | Seed: {current_maze_seed}",
                 "H: Hint path | T: Toggle hint path",
                 "Save(F5) Load(F9) | Mouse wheel to zoom | Drag to pan"
-            ], current_theme["text"])
+            ]
+            info_color = current_theme["text"]
+        toast = active_toast()
+        if toast:
+            info_lines, info_color = [toast[0]], toast[1]
 
-        pygame.display.flip()
+        render_game_frame(top_offset_x, top_offset_y, info_lines, info_color)
 
     return "exit"
 
+def show_replay_step(cells, step):
+    # Jump straight to a step: rebuild the trail bitmap from the precomputed cells
+    # and redraw once, without rendering the moves in between.
+    global player_pos, trail, steps
+    trail = Trail(MAZE_WIDTH, MAZE_HEIGHT)
+    for cell in cells[:step]:
+        trail.visit(*cell)
+    player_pos = list(cells[step])
+    steps = step
+    if not maze_fits_view():
+        center_view_on(player_pos)
+    request_full_redraw()
+
+def playback_loop(replay):
+    global zoom_level, pan_offset_x, pan_offset_y, hint_path, power_ups, steps, win
+    install_maze(prepare_maze(replay.width, replay.height, replay.seed, replay.algorithm))
+    cells = replay.path(maze)
+    if cells is None:
+        return False
+    verified = verify_replay(replay)
+    power_ups = {}
+    hint_path = None
+    win = False  # left over from the last game; it would draw the win message
+    zoom_level = 1.0
+    pan_offset_x = 0
+    pan_offset_y = 0
+    compute_cell_size()
+
+    step = 0
+    speed = 0
+    playing = True
+    replay_time = 0
+    show_replay_step(cells, step)
+    drawn_view = None
+
+    while True:
+        elapsed = clock.tick(60)
+        target = step
+        for event in pygame.event.get():
+            if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION):
+                handle_pan_event(event)
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    if event.button == 4:
+                        zoom_in()
+                    elif event.button == 5:
+                        zoom_out()
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_ESCAPE, pygame.K_q):
+                    return True
+                elif event.key == pygame.K_SPACE:
+                    playing = not playing
+                elif event.key == pygame.K_UP:
+                    speed = min(speed + 1, len(REPLAY_SPEEDS) - 1)
+                elif event.key == pygame.K_DOWN:
+                    speed = max(speed - 1, 0)
+                elif event.key == pygame.K_RIGHT:
+                    playing, target = False, target + 1
+                elif event.key == pygame.K_LEFT:
+                    playing, target = False, target - 1
+                elif event.key == pygame.K_PAGEDOWN:
+                    target += max(1, len(replay) // 10)
+                elif event.key == pygame.K_PAGEUP:
+                    target -= max(1, len(replay) // 10)
+                elif event.key == pygame.K_HOME:
+                    target = 0
+                elif event.key == pygame.K_END:
+                    target = len(replay)
+
+        if target != step:
+            step = max(0, min(len(replay), target))
+            replay_time = replay.ticks[step - 1] if step else 0
+            show_replay_step(cells, step)
+        elif playing and step < len(replay):
+            replay_time += elapsed * REPLAY_SPEEDS[speed]
+            moved = step
+            while step < len(replay) and replay.ticks[step] <= replay_time:
+                visit_trail_cell(*cells[step])
+                mark_cell_dirty(*cells[step])
+                step += 1
+                mark_cell_dirty(*cells[step])
+            if step != moved:
+                player_pos[:] = cells[step]
+                steps = step
+                if not maze_fits_view():
+                    x0, y0, x1, y1 = visible_cell_range(*maze_offsets())
+                    if not (x0 + 2 <= player_pos[0] < x1 - 2 and y0 + 2 <= player_pos[1] < y1 - 2):
+                        center_view_on(player_pos)
+
+        top_offset_x, top_offset_y = maze_offsets()
+        view = (top_offset_x, top_offset_y, zoom_level, CELL_SIZE, current_theme_name, show_hint_path)
+        if view != drawn_view:
+            request_full_redraw()
+            drawn_view = view
+
+        info_lines = [
+            f"Replay {replay.width}x{replay.height} | Seed: {replay.seed} | "
+            + ("Verified" if verified else "Not verified"),
+            f"Step {step}/{len(replay)} | Time: {replay_time // 1000}s | Speed: {REPLAY_SPEEDS[speed]}x"
+            + ("" if playing else " (paused)"),
+            "SPACE: Play/Pause | UP/DOWN: Speed | LEFT/RIGHT: Step",
+            "PGUP/PGDN: Jump back/ahead 10% | HOME/END: Start/End | ESC: Back"
+        ]
+        render_game_frame(top_offset_x, top_offset_y, info_lines, current_theme["text"])
+
 def run():
-    global maze, MAZE_WIDTH, MAZE_HEIGHT, player_pos, exit_pos, CELL_SIZE
+    global maze, MAZE_WIDTH, MAZE_HEIGHT, CELL_SIZE
     global current_size_index, current_theme_name, current_theme
     global show_hint_path, zoom_level, pan_offset_x, pan_offset_y
     global trail, steps, start_time, paused
@@ -878,54 +2890,260 @@ def run():
             draw_leaderboard_menu()
         elif choice == "Settings":
             settings_menu()
-        elif choice == "Start Game":
-            res = choose_maze_size_menu()
-            if res is None:
-                continue
-            size, idx = res
-            if size is None:
-                continue
-            current_size_index = idx
-            MAZE_WIDTH, MAZE_HEIGHT = size
-            current_theme_name = current_theme_name or "Classic"
-            current_theme = THEMES.get(current_theme_name, THEMES["Classic"])
-            CELL_SIZE = MAZE_PIXEL_SIZE // MAZE_WIDTH
-            zoom_level = 1.0
-            pan_offset_x = 0
-            pan_offset_y = 0
-            show_hint_path = True
-            maze = maze_generate_data(MAZE_WIDTH, MAZE_HEIGHT)
-            player_pos, exit_pos = find_start_exit()
-            trail = []
-            steps = 0
-            start_time = pygame.time.get_ticks()
+        elif choice in ("Start Game", "Continue"):
+            resume = choice == "Continue"
+            if resume:
+                if not load_game(AUTOSAVE_FILE, recover=True):
+                    continue
+            else:
+                res = choose_maze_size_menu()
+                if res is None:
+                    continue
+                size, idx = res
+                if size is None:
+                    continue
+                current_size_index = idx
+                MAZE_WIDTH, MAZE_HEIGHT = size
+                current_theme_name = current_theme_name or "Classic"
+                current_theme = THEMES.get(current_theme_name, THEMES["Classic"])
+                compute_cell_size()
+                zoom_level = 1.0
+                pan_offset_x = 0
+                pan_offset_y = 0
+                show_hint_path = True
+                maze_pool.select(size)
+                install_maze(maze_pool.take(size))
+                trail = Trail(MAZE_WIDTH, MAZE_HEIGHT)
+                steps = 0
+                start_time = pygame.time.get_ticks()
             paused = False
             while True:
-                result = game_loop(MAZE_WIDTH, MAZE_HEIGHT)
+                result = game_loop(MAZE_WIDTH, MAZE_HEIGHT, resume)
+                resume = False
                 if result == "exit":
                     pygame.quit()
                     sys.exit()
                 elif result == "main_menu":
                     break
                 elif result == "new_maze":
-                    maze = maze_generate_data(MAZE_WIDTH, MAZE_HEIGHT)
-                    player_pos, exit_pos = find_start_exit()
-                    trail = []
+                    install_maze(maze_pool.take((MAZE_WIDTH, MAZE_HEIGHT)))
+                    trail = Trail(MAZE_WIDTH, MAZE_HEIGHT)
                     steps = 0
                     start_time = pygame.time.get_ticks()
                     zoom_level = 1.0
                     pan_offset_x = 0
                     pan_offset_y = 0
                 elif result == "restart_same":
-                    trail = []
+                    trail = Trail(MAZE_WIDTH, MAZE_HEIGHT)
                     steps = 0
                     start_time = pygame.time.get_ticks()
-                    player_pos, exit_pos = find_start_exit()
+                    restart_maze()
                     zoom_level = 1.0
                     pan_offset_x = 0
                     pan_offset_y = 0
 
+# Multiprocess batches: maze i always uses seed base_seed + i, so the output does
+# not depend on the number of workers or the chunk size. Workers send back each
+# chunk as two flat byte strings (int64 metadata and bit-packed grids) instead of
+# pickled grids.
+BATCH_FIELDS = ("seed", "start_x", "start_y", "exit_x", "exit_y", "length", "expanded")
+BATCH_MAGIC = b"MZB1"
+
+def _batch_chunk(job):
+    first, n, width, height, algorithm, solver, base_seed = job
+    meta = array("q")
+    grids = bytearray()
+    for i in range(first, first + n):
+        seed = base_seed + i
+        grid = maze_generate_data(width, height, algorithm, random.Random(seed))
+        start, exit = find_start_exit(grid)
+        stats = {"expanded": 0}
+        path = SOLVERS[solver](grid, tuple(start), tuple(exit), stats) if solver else []
+        meta.extend((seed, start[0], start[1], exit[0], exit[1],
+                     len(path) if path is not None else -1, stats.get("expanded", 0)))
+        grids += grid.to_packed_bits()
+    return meta.tobytes(), bytes(grids)
+
+class MazeBatch:
+    __slots__ = ("width", "height", "meta", "grids")
+
+    def __init__(self, width, height, meta, grids):
+        self.width = width
+        self.height = height
+        self.meta = meta
+        self.grids = grids
+
+    def __len__(self):
+        return len(self.meta) // len(BATCH_FIELDS)
+
+    def grid_bytes(self):
+        return (self.width * self.height + 7) // 8
+
+    def record(self, i):
+        n = len(BATCH_FIELDS)
+        return dict(zip(BATCH_FIELDS, self.meta[i*n:(i+1)*n]))
+
+    def grid(self, i):
+        stride = self.grid_bytes()
+        return MazeGrid.from_packed_bits(self.width, self.height, self.grids[i*stride:(i+1)*stride])
+
+    def write(self, path):
+        with open(path, "wb") as f:
+            f.write(BATCH_MAGIC + struct.pack("<III", len(self), self.width, self.height))
+            f.write(self.meta.tobytes())
+            f.write(self.grids)
+
+    @classmethod
+    def read(cls, path):
+        with open(path, "rb") as f:
+            if f.read(4) != BATCH_MAGIC:
+                raise ValueError("not a maze batch file")
+            count, width, height = struct.unpack("<III", f.read(12))
+            meta = array("q")
+            meta.frombytes(f.read(8 * len(BATCH_FIELDS) * count))
+            return cls(width, height, meta, f.read())
+
+def batch_generate_and_solve(count, width, height, algorithm=DEFAULT_MAZE_ALGORITHM, solver="bfs",
+                             base_seed=0, workers=None, chunk_size=256):
+    jobs = [(first, min(chunk_size, count - first), width, height, algorithm, solver, base_seed)
+            for first in range(0, count, chunk_size)]
+    meta = array("q")
+    grids = bytearray()
+    if workers == 1:
+        results = map(_batch_chunk, jobs)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_batch_chunk, jobs)
+    try:
+        for meta_bytes, grid_bytes in results:
+            meta.frombytes(meta_bytes)
+            grids += grid_bytes
+    finally:
+        if workers != 1:
+            executor.shutdown()
+    return MazeBatch(width, height, meta, bytes(grids))
+
+# Headless mode: generation, solving and benchmarks without a display, streamed
+# to stdout as JSON Lines (one object per maze / solver run / benchmark entry).
+
+def path_is_valid(grid, start, goal, path):
+    x, y = start
+    for cx, cy in path:
+        if abs(cx - x) + abs(cy - y) != 1 or not grid.is_open(cx, cy):
+            return False
+        x, y = cx, cy
+    return (x, y) == tuple(goal)
+
+def headless_generate(args):
+    for i in range(args.count):
+        seed = args.seed + i
+        began = time.perf_counter()
+        grid = generate_seeded_maze(args.algorithm, args.width, args.height, seed, not args.no_cache)
+        start, exit = find_start_exit(grid)
+        record = {"algorithm": args.algorithm, "width": args.width, "height": args.height, "seed": seed,
+                  "start": start, "exit": exit, "open_cells": grid.cells.count(0),
+                  "seconds": round(time.perf_counter() - began, 4)}
+        if args.grid:
+            record["grid"] = [bytes(row).translate(BIT_DIGITS).decode() for row in
+                              (grid.cells[y*grid.width:(y+1)*grid.width] for y in range(grid.height))]
+        yield record
+
+def headless_solve(args):
+    solvers = list(SOLVERS) if args.solver == "all" else [] if args.solver == "none" else [args.solver]
+    for i in range(args.count):
+        seed = args.seed + i
+        grid = generate_seeded_maze(args.algorithm, args.width, args.height, seed, not args.no_cache)
+        start, exit = find_start_exit(grid)
+        # Every solver is checked against the BFS path length for optimality.
+        reference = solve_bfs(grid, tuple(start), tuple(exit)) if solvers else None
+        for name in solvers:
+            stats = {}
+            began = time.perf_counter()
+            path = SOLVERS[name](grid, tuple(start), tuple(exit), stats)
+            elapsed = time.perf_counter() - began
+            yield {"algorithm": args.algorithm, "width": args.width, "height": args.height, "seed": seed,
+                   "solver": name, "length": len(path) if path is not None else None,
+                   "expanded": stats.get("expanded"), "seconds": round(elapsed, 4),
+                   "valid": path is not None and path_is_valid(grid, start, exit, path),
+                   "optimal": path is not None and reference is not None and len(path) == len(reference)}
+
+def headless_batch(args):
+    if args.solver == "all":
+        raise SystemExit("--headless batch takes a single --solver (or none)")
+    began = time.perf_counter()
+    batch = batch_generate_and_solve(args.count, args.width, args.height, args.algorithm,
+                                     None if args.solver == "none" else args.solver,
+                                     args.seed, args.workers, args.chunk_size)
+    elapsed = time.perf_counter() - began
+    if args.output:
+        batch.write(args.output)
+    for i in range(len(batch)):
+        yield batch.record(i)
+    yield {"summary": True, "count": len(batch), "seconds": round(elapsed, 3),
+           "mazes_per_second": round(len(batch) / elapsed, 1) if elapsed else None,
+           "output": args.output}
+
+def headless_verify(args):
+    entries = [{"replay": path} for path in args.replay] if args.replay else leaderboard_replays()
+    for entry in entries:
+        try:
+            replay = Replay.read(entry["replay"])
+        except (OSError, ValueError, struct.error) as e:
+            yield {**entry, "valid": False, "error": str(e)}
+            continue
+        yield {**entry, "width": replay.width, "height": replay.height, "seed": replay.seed,
+               "moves": len(replay), "duration_ms": replay.duration(),
+               "valid": verify_replay(replay, entry.get("time"), entry.get("steps"))}
+
+def headless_bench(args):
+    if args.suite in ("generators", "all"):
+        yield from benchmark_generators(args.sizes or (101, 1001, 4001))
+    if args.suite in ("solvers", "all"):
+        yield from benchmark_solvers(args.sizes or (101, 501, 1001), algorithm=args.algorithm)
+
+def maze_dimension(value):
+    # A maze needs at least one room inside its border walls.
+    size = int(value)
+    if size < 3:
+        raise argparse.ArgumentTypeError(f"maze sizes must be at least 3, got {size}")
+    return size
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Maze Explorer 2D")
+    parser.add_argument("--headless", choices=["generate", "solve", "batch", "bench", "verify"],
+                        help="run without a display and stream JSON Lines to stdout")
+    parser.add_argument("--width", type=maze_dimension, default=DEFAULT_MAZE_SIZE)
+    parser.add_argument("--height", type=maze_dimension, default=DEFAULT_MAZE_SIZE)
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None, help="seed of the first maze (then seed+1, ...)")
+    parser.add_argument("--algorithm", default=DEFAULT_MAZE_ALGORITHM,
+                        choices=sorted(MAZE_GENERATORS), help="numpy_* generators need NumPy")
+    parser.add_argument("--solver", default="bfs", choices=sorted(SOLVERS) + ["all", "none"])
+    parser.add_argument("--grid", action="store_true", help="include the maze rows in generate output")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the maze cache")
+    parser.add_argument("--suite", default="all", choices=["generators", "solvers", "all"])
+    parser.add_argument("--sizes", type=maze_dimension, nargs="+")
+    parser.add_argument("--workers", type=int, default=None, help="batch worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="mazes per batch work unit")
+    parser.add_argument("--output", help="write the batch as a binary corpus file")
+    parser.add_argument("--replay", nargs="+", help="replay files to verify (default: every leaderboard replay)")
+    args = parser.parse_args(argv)
+    if args.seed is None:
+        args.seed = new_maze_seed()
+    return args
+
+def headless_main(args):
+    commands = {"generate": headless_generate, "solve": headless_solve, "batch": headless_batch,
+                "bench": headless_bench, "verify": headless_verify}
+    for record in commands[args.headless](args):
+        sys.stdout.write(json.dumps(record) + "\n")
+        sys.stdout.flush()
+
 if __name__ == "__main__":
-    run()
+    args = parse_args()
+    if args.headless:
+        headless_main(args)
+    else:
+        run()
 
 